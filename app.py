@@ -5,30 +5,20 @@ app.py - Point d'entrée principal de l'application avec interface graphique
 
 import sys
 import os
-from pathlib import Path
-
-# Ajouter le répertoire courant au path pour les imports
-sys.path.insert(0, str(Path(__file__).parent))
+import importlib.util
 
 def check_dependencies():
     """Vérifie que toutes les dépendances sont installées."""
     missing_deps = []
     
-    # Vérifier les dépendances
-    try:
-        import docx
-    except ImportError:
-        missing_deps.append('python-docx')
-    
-    try:
-        import cohere
-    except ImportError:
-        missing_deps.append('cohere')
-    
-    try:
-        import tkinterdnd2
-    except ImportError:
-        missing_deps.append('tkinterdnd2')
+    # Vérifier les dépendances sans exécuter les modules (find_spec n'importe rien)
+    for module_name, package_name in [
+        ('docx', 'python-docx'),
+        ('cohere', 'cohere'),
+        ('tkinterdnd2', 'tkinterdnd2'),
+    ]:
+        if importlib.util.find_spec(module_name) is None:
+            missing_deps.append(package_name)
     
     if missing_deps:
         print("Dépendances manquantes détectées!")
@@ -42,15 +32,33 @@ def check_dependencies():
     
     return True
 
+USAGE = """Usage: python app.py [--help]
+
+Lance l'interface graphique du convertisseur de PV DocX vers LaTeX/PDF.
+
+Options:
+  -h, --help    Affiche cette aide et quitte (sans charger l'interface graphique)
+"""
+
 def main():
     """Lance l'application avec interface graphique."""
     
+    # Traiter les arguments avant tout import lourd (tkinter, docx, cohere)
+    if any(arg in ('-h', '--help') for arg in sys.argv[1:]):
+        print(USAGE)
+        return
+    
     # Vérifier les dépendances
     if not check_dependencies():
         print("\n L'application ne peut pas démarrer sans les dépendances requises.")
         input("\nAppuyez sur Entrée pour quitter...")
         sys.exit(1)
     
+    # Ajouter le répertoire courant au path pour les imports (inutile une fois gelé par PyInstaller)
+    if not getattr(sys, 'frozen', False):
+        from pathlib import Path
+        sys.path.insert(0, str(Path(__file__).parent))
+    
     try:
         # Importer et lancer l'interface graphique
         from gui import ConverterGUI
@@ -8,82 +8,52 @@ import sys
 import subprocess
 import platform
 import shutil
+import hashlib
 from pathlib import Path
 
-class ExecutableBuilder:
-    """Classe pour construire les exécutables multi-plateformes."""
-    
-    def __init__(self):
-        self.root_dir = Path(__file__).parent
-        self.dist_dir = self.root_dir / "dist"
-        self.build_dir = self.root_dir / "build"
-        self.system = platform.system()
-        
-    def clean_previous_builds(self):
-        """Nettoie les builds précédents."""
-        print(" Nettoyage des builds précédents...")
-        
-        for directory in [self.dist_dir, self.build_dir]:
-            if directory.exists():
-                shutil.rmtree(directory)
-                print(f"    Supprimé: {directory}")
-        
-        # Supprimer les fichiers spec
-        for spec_file in self.root_dir.glob("*.spec"):
-            spec_file.unlink()
-            print(f"    Supprimé: {spec_file}")
-    
-    def check_pyinstaller(self):
-        """Vérifie que PyInstaller est installé."""
-        print("\n Vérification de PyInstaller...")
-        
-        try:
-            import PyInstaller
-            print(f"    PyInstaller {PyInstaller.__version__} détecté")
-            return True
-        except ImportError:
-            print("    PyInstaller non détecté")
-            print("\n   Installation de PyInstaller...")
-            subprocess.check_call([sys.executable, "-m", "pip", "install", "pyinstaller"])
-            print("    PyInstaller installé")
-            return True
-    
-    def create_launcher_script(self):
-        """Crée un script de lancement qui gère LaTeX."""
-        print("\n Création du script de lancement...")
-        
-        launcher_content = '''#!/usr/bin/env python3
+# Modules de l'application embarqués dans l'exécutable
+DATA_FILES = [
+    'config.py',
+    'converter.py',
+    'gui.py',
+    'latex_generator.py',
+    'text_corrector.py',
+    'utils.py',
+]
+
+HIDDEN_IMPORTS = ['tkinter', 'tkinterdnd2', 'docx', 'cohere']
+
+# Modules lourds jamais utilisés par l'application, exclus pour alléger le bundle
+EXCLUDED_MODULES = ['matplotlib', 'scipy', 'PIL.ImageQt']
+
+# Script de lancement embarqué dans l'exécutable (écrit dans un fichier temporaire au build)
+_LAUNCHER_SRC = '''#!/usr/bin/env python3
 """
 Launcher - Point d'entrée avec vérification LaTeX
 """
 
 import sys
 import os
-import subprocess
+import shutil
 import platform
 from pathlib import Path
 
+_SYSTEM = platform.system()
+
 def check_latex():
-    """Vérifie si LaTeX est installé."""
-    try:
-        subprocess.run(['pdflatex', '--version'], 
-                      capture_output=True, 
-                      check=True)
-        return True
-    except (subprocess.CalledProcessError, FileNotFoundError):
-        return False
+    """Vérifie si LaTeX est installé (recherche dans le PATH, sans lancer pdflatex)."""
+    return shutil.which('pdflatex') is not None
 
 def show_latex_warning():
     """Affiche un avertissement si LaTeX n'est pas installé."""
+    # tkinter n'est importé que si LaTeX est absent
     import tkinter as tk
     from tkinter import messagebox
     
     root = tk.Tk()
     root.withdraw()
     
-    system = platform.system()
-    
-    if system == "Windows":
+    if _SYSTEM == "Windows":
         message = (
             "LaTeX (MiKTeX) n'est pas installé sur votre système.\\n\\n"
             "L'application fonctionnera mais ne pourra pas générer de PDF.\\n\\n"
@@ -130,66 +100,131 @@ def main():
 if __name__ == "__main__":
     main()
 '''
+
+
+class ExecutableBuilder:
+    """Classe pour construire les exécutables multi-plateformes."""
+    
+    def __init__(self):
+        self.root_dir = Path(__file__).parent
+        self.dist_dir = self.root_dir / "dist"
+        self.build_dir = self.root_dir / "build"
+        self.build_hash_file = self.build_dir / ".build_hash"
+        self.system = platform.system()
+    
+    def compute_build_hash(self):
+        """Calcule une empreinte des sources et des options de build."""
+        h = hashlib.blake2b()
+        for path in sorted(self.root_dir.glob("*.py")):
+            h.update(path.name.encode())
+            h.update(path.read_bytes())
+        h.update(_LAUNCHER_SRC.encode())
+        h.update(repr((self.system, self._common_pyi_args(''))).encode())
+        return h.hexdigest()
+    
+    def is_build_up_to_date(self, build_hash):
+        """Indique si le dernier build réussi correspond aux sources actuelles."""
+        try:
+            return self.build_hash_file.read_text(encoding='utf-8') == build_hash
+        except OSError:
+            return False
+        
+    def clean_previous_builds(self):
+        """Nettoie les builds précédents."""
+        print(" Nettoyage des builds précédents...")
+        
+        for directory in [self.dist_dir, self.build_dir]:
+            if directory.exists():
+                shutil.rmtree(directory)
+                print(f"    Supprimé: {directory}")
+        
+        # Supprimer les fichiers spec
+        for spec_file in self.root_dir.glob("*.spec"):
+            spec_file.unlink()
+            print(f"    Supprimé: {spec_file}")
+    
+    def check_pyinstaller(self):
+        """Vérifie que PyInstaller est installé."""
+        print("\n Vérification de PyInstaller...")
+        
+        try:
+            import PyInstaller
+            print(f"    PyInstaller {PyInstaller.__version__} détecté")
+            return True
+        except ImportError:
+            print("    PyInstaller non détecté")
+            print("\n   Installation de PyInstaller...")
+            subprocess.check_call([sys.executable, "-m", "pip", "install", "pyinstaller"])
+            print("    PyInstaller installé")
+            return True
+    
+    def create_launcher_script(self):
+        """Crée un script de lancement qui gère LaTeX."""
+        print("\n Création du script de lancement...")
         
-        launcher_path = self.root_dir / "launcher.py"
-        with open(launcher_path, 'w', encoding='utf-8') as f:
-            f.write(launcher_content)
+        # Chemin stable (et fichier réécrit seulement s'il change) : PyInstaller peut réutiliser
+        # son cache d'analyse dans build/ d'un build à l'autre
+        launcher_path = self.build_dir / "launcher.py"
+        try:
+            up_to_date = launcher_path.read_text(encoding='utf-8') == _LAUNCHER_SRC
+        except OSError:
+            up_to_date = False
         
-        print(f"    Script créé: {launcher_path}")
+        if up_to_date:
+            print(f"    Script inchangé: {launcher_path}")
+        else:
+            launcher_path.parent.mkdir(parents=True, exist_ok=True)
+            launcher_path.write_text(_LAUNCHER_SRC, encoding='utf-8')
+            print(f"    Script créé: {launcher_path}")
         return launcher_path
     
-    def build_windows(self):
-        """Construit l'exécutable Windows."""
-        print("\n Construction de l'exécutable Windows...")
+    def run_pyinstaller(self, args):
+        """Lance PyInstaller dans le processus courant (pas de sous-processus Python)."""
+        import PyInstaller.__main__
         
-        cmd = [
-            sys.executable,
-            '-m', 'PyInstaller',
+        try:
+            PyInstaller.__main__.run(args)
+        except SystemExit as e:
+            if e.code:
+                raise subprocess.CalledProcessError(e.code, ['pyinstaller', *args])
+    
+    def _common_pyi_args(self, sep: str):
+        """Arguments PyInstaller communs aux deux plateformes (`sep` : séparateur de --add-data)."""
+        return [
             '--name=ConvertisseurDocxLatex',
-            '--onefile',
+            '--noconfirm',
             '--windowed',
-            '--add-data=config.py;.',
-            '--add-data=converter.py;.',
-            '--add-data=gui.py;.',
-            '--add-data=latex_generator.py;.',
-            '--add-data=text_corrector.py;.',
-            '--add-data=utils.py;.',
-            '--hidden-import=tkinter',
-            '--hidden-import=tkinterdnd2',
-            '--hidden-import=docx',
-            '--hidden-import=cohere',
+            *(f'--add-data={name}{sep}.' for name in DATA_FILES),
+            *(f'--hidden-import={name}' for name in HIDDEN_IMPORTS),
+            *(f'--exclude-module={name}' for name in EXCLUDED_MODULES),
             '--collect-all=tkinterdnd2',
-            'launcher.py'
+            f'--paths={self.root_dir}',
+        ]
+    
+    def build_windows(self, launcher: Path):
+        """Construit l'exécutable Windows."""
+        print("\n Construction de l'exécutable Windows...")
+        
+        args = [
+            *self._common_pyi_args(';'),
+            '--onefile',
+            str(launcher)
         ]
         
-        subprocess.check_call(cmd)
+        self.run_pyinstaller(args)
         print("    Exécutable Windows créé avec succès!")
     
-    def build_macos(self):
+    def build_macos(self, launcher: Path):
         """Construit l'exécutable macOS."""
         print("\n Construction de l'application macOS...")
         
-        cmd = [
-            sys.executable,
-            '-m', 'PyInstaller',
-            '--name=ConvertisseurDocxLatex',
-            '--windowed',
-            '--add-data=config.py:.',
-            '--add-data=converter.py:.',
-            '--add-data=gui.py:.',
-            '--add-data=latex_generator.py:.',
-            '--add-data=text_corrector.py:.',
-            '--add-data=utils.py:.',
-            '--hidden-import=tkinter',
-            '--hidden-import=tkinterdnd2',
-            '--hidden-import=docx',
-            '--hidden-import=cohere',
-            '--collect-all=tkinterdnd2',
+        args = [
+            *self._common_pyi_args(':'),
             '--osx-bundle-identifier=com.cbb.convertisseur',
-            'launcher.py'
+            str(launcher)
         ]
         
-        subprocess.check_call(cmd)
+        self.run_pyinstaller(args)
         print("    Application macOS créée avec succès!")
     
     def create_readme(self):
@@ -289,8 +324,12 @@ Pour une expérience complète, l'installation de LaTeX est fortement recommand
         print(" Construction de l'exécutable")
         print("=" * 60)
         
-        # Nettoyage
-        self.clean_previous_builds()
+        # Nettoyage (uniquement si les sources ont changé : PyInstaller réutilise alors son cache build/)
+        build_hash = self.compute_build_hash()
+        if self.is_build_up_to_date(build_hash):
+            print(" Sources inchangées depuis le dernier build, conservation du cache PyInstaller")
+        else:
+            self.clean_previous_builds()
         
         # Vérification PyInstaller
         self.check_pyinstaller()
@@ -301,9 +340,9 @@ Pour une expérience complète, l'installation de LaTeX est fortement recommand
         try:
             # Build selon la plateforme
             if self.system == "Windows":
-                self.build_windows()
+                self.build_windows(launcher)
             elif self.system == "Darwin":  # macOS
-                self.build_macos()
+                self.build_macos(launcher)
             else:
                 print(f"\n Système non supporté: {self.system}")
                 print("   Ce script supporte uniquement Windows et macOS")
@@ -312,6 +351,10 @@ Pour une expérience complète, l'installation de LaTeX est fortement recommand
             # Création du README
             self.create_readme()
             
+            # Mémoriser l'empreinte du build réussi
+            self.build_hash_file.parent.mkdir(parents=True, exist_ok=True)
+            self.build_hash_file.write_text(build_hash, encoding='utf-8')
+            
             print("\n" + "=" * 60)
             print(" BUILD RÉUSSI!")
             print("=" * 60)
@@ -330,16 +373,12 @@ Pour une expérience complète, l'installation de LaTeX est fortement recommand
         except subprocess.CalledProcessError as e:
             print(f"\n Erreur lors du build: {e}")
             return False
-        finally:
-            # Nettoyage du launcher temporaire
-            if launcher.exists():
-                launcher.unlink()
 
 def main():
     """Point d'entrée principal."""
     builder = ExecutableBuilder()
     
-    print("\n  Système détecté:", platform.system())
+    print("\n  Système détecté:", builder.system)
     print(" Python version:", sys.version.split()[0])
     print()
     
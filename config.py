@@ -3,19 +3,74 @@ config.py - Configuration centralisée pour le convertisseur
 """
 
 import os
-from typing import Dict, List, Optional
+import re
+import sys
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Pattern, Tuple
+
+# Attributs issus des fichiers éditables (et leurs index), chargés au premier accès
+_RESOURCE_ATTRIBUTES = frozenset({
+    'ABBREVIATIONS', 'ABBREVIATIONS_COMPILED', 'ABBREVIATIONS_GROUPS', 'ABBREVIATIONS_PATTERN',
+    'LATEX_SPECIAL_CHARS', 'LATEX_TRANSLATE_TABLE', 'LATEX_SPECIAL_SEQUENCES', 'LATEX_SEQUENCES_PATTERN',
+    'CORRECTION_WHITELIST', 'CORRECTION_WHITELIST_SET', 'CORRECTION_WHITELIST_PATTERN',
+    'CORRECTION_PROMPT_TEMPLATE',
+})
+
+# Lignes non vides et hors commentaires, sans les espaces de début et de fin
+_LINE_RE = re.compile(r'(?m)^\s*([^#\s][^\n]*?)\s*$')
+
+# Lignes de commentaire (« # ... ») du prompt, retirées avant envoi à l'API
+_COMMENT_LINE_RE = re.compile(r'(?m)^[ \t]*#[^\n]*(?:\n|$)')
+
+# Séparateurs clé/valeur par ordre de priorité : '=>' puis ':' puis '='
+_KV_SPLIT = re.compile(r'(.*?)\s*=>\s*(.*)|(.*?)\s*:\s*(.*)|(.*?)\s*=\s*(.*)')
+
+# Échappements toujours appliqués, complétés/surchargés par special_chars.txt :
+# '#' ne peut pas y figurer (ligne de commentaire) et la barre oblique inverse n'y est pas prévue
+_LATEX_BASE_ESCAPES = {
+    '\\': r'\textbackslash{}',
+    '#': r'\#',
+}
+
+# Nombre de rendus du prompt (couples template/whitelist) conservés
+_PROMPT_CACHE_SIZE = 8
+
+DEFAULT_CORRECTION_PROMPT_TEMPLATE = (
+    "Corrige le texte suivant en français :\n"
+    "- Corrige les fautes d'orthographe, de grammaire, de ponctuation, de conjugaison et la concordance des temps.\n"
+    "- Améliore la syntaxe et la clarté.\n"
+    "- Ne modifie pas les noms propres, les anglicismes ni le latin (ex: io vivat).\n"
+    "- Ne modifie pas les mots suivants : {whitelist}.\n\n"
+    "Ta réponse doit UNIQUEMENT contenir le texte corrigé, sans explications ni commentaires.\n"
+    "Conserve les marqueurs <<<PARA_n>>> tels quels, chacun sur sa propre ligne avant son paragraphe.\n\n"
+    "Texte à corriger :\n\n{text}\n"
+)
 
 class Config:
     """Configuration centralisée pour le convertisseur DocX vers LaTeX."""
     
     def __init__(self):
+        # Fichiers éditables : dossier de base et cache {nom: (mtime_ns, contenu parsé)}
+        self._base = Path(__file__).parent
+        self._file_cache: Dict[str, Tuple[Optional[int], Any]] = {}
+        self._entries: Dict[str, os.DirEntry] = {}
+
         # API Configuration
-        self.COHERE_API_KEY = os.getenv('COHERE_API_KEY', 'nlyRQZmMg67jyS0RmN3wofNlBG74V12gIjP0EV8L')
+        # Clé API : variable d'environnement, sinon fichier `.cohere_key` lu au premier appel
+        self.COHERE_API_KEY: Optional[str] = os.getenv('COHERE_API_KEY')
         self.COHERE_MODEL = 'command-a-03-2025'
+        self._cohere_client = None
         
         # Batch processing
-        self.BATCH_SIZE = 100
-        self.BATCH_SEPARATOR = "#SEP#"
+        self.BATCH_SIZE = 100  # nombre maximal de paragraphes par lot
+        # Taille maximale du texte d'un lot (marqueurs de paragraphe compris), hors prompt
+        self.MAX_CHARS_PER_BATCH = 8000
+        # Nombre maximal de lots envoyés simultanément à l'API de correction
+        self.MAX_CONCURRENCY = 16
+        # Limite commune à toutes les conversions partageant cette config (le GUI en lance
+        # plusieurs en parallèle) : MAX_CONCURRENCY requêtes en vol au total, pas par document
+        self._api_slots = threading.BoundedSemaphore(self.MAX_CONCURRENCY)
         
         # LaTeX settings
         self.LATEX_PACKAGES = [
@@ -39,132 +94,315 @@ class Config:
             "\\setlength{\\parindent}{0pt}",
             "\\setlength{\\parskip}{1em}"
         ]
+        self.build_latex_preamble()
         
+        # Document paths
+        self.DEFAULT_LOGO_PATH = "../logo.png"
+
+        # Fichiers éditables (abréviations, caractères spéciaux, whitelist, prompt) :
+        # chargés au premier accès, voir `__getattr__`
+        self._resources_loaded = False
+        self._resources_lock = threading.Lock()  # config partagée entre les threads de conversion
+        self._prompt_parts: List[tuple] = []  # [(template, whitelist, parties)], plus récent d'abord
+        self._prompt_lock = threading.Lock()
+    
+    def __getattr__(self, name: str):
+        # Appelé uniquement si l'attribut est absent : charge les fichiers éditables à la demande
+        if name in _RESOURCE_ATTRIBUTES and not self.__dict__.get('_resources_loaded', True):
+            self._load_resources()
+            return self.__dict__[name]
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+
+    def _load_resources(self) -> None:
+        """Charge les fichiers éditables (les valeurs déjà assignées explicitement sont conservées)."""
+        with self._resources_lock:
+            # Un autre thread a pu terminer le chargement pendant l'attente du verrou
+            if self._resources_loaded:
+                return
+            self._read_resources()
+            # Drapeau levé seulement une fois tous les attributs assignés
+            self._resources_loaded = True
+
+    def _read_resources(self) -> None:
+        """Lit les fichiers éditables et construit leurs index (appelé sous `_resources_lock`)."""
+        self._entries = self._dir_entries()
+
         # Text replacements (loaded from file `abbreviations.txt`)
-        self.ABBREVIATIONS: Dict[str, str] = self._read_kv_file('abbreviations.txt', default={
-            r'\bitw\b': 'interview',
-            r'\bdeleg\b': 'délégation',
-            r'\bdéleg\b': 'délégation',
-            r'\bdélég\b': 'délégation',
-            r'\bqqch\b': 'quelque chose',
-            r'\bqqun\b': "quelqu'un",
-            r'\bpcq\b': "parce que",
-            r'\bprez\b': "président",
-            r'\btrez\b': "trésorier",
-            r'\bvp\b': "vice-président"
-        })
+        if 'ABBREVIATIONS' not in self.__dict__:
+            self.ABBREVIATIONS: Dict[str, str] = self._read_kv_file('abbreviations.txt', default={
+                r'\bitw\b': 'interview',
+                r'\bdeleg\b': 'délégation',
+                r'\bdéleg\b': 'délégation',
+                r'\bdélég\b': 'délégation',
+                r'\bqqch\b': 'quelque chose',
+                r'\bqqun\b': "quelqu'un",
+                r'\bpcq\b': "parce que",
+                r'\bprez\b': "président",
+                r'\btrez\b': "trésorier",
+                r'\bvp\b': "vice-président"
+            })
+        self._compile_abbreviations()
 
         # Special LaTeX characters (loaded from file `special_chars.txt`)
-        self.LATEX_SPECIAL_CHARS: Dict[str, str] = self._read_kv_file('special_chars.txt', default={
-            '&': r'\&',
-            '%': r'\%',
-            '$': r'\$',
-            '#': r'\#',
-            '_': r'\_',
-            '{': r'\{',
-            '}': r'\}',
-            '~': r'\textasciitilde{}',
-            '^': r'\textasciicircum{}',
-            '€': r'\euro{}',
-            '<': r'\textless{}',
-            '>': r'\textgreater{}',
-            '°': r'\textdegree{}'
-        })
-        # Document paths
-        self.DEFAULT_LOGO_PATH = "../logo.png"
-        
+        if 'LATEX_SPECIAL_CHARS' not in self.__dict__:
+            self.LATEX_SPECIAL_CHARS: Dict[str, str] = self._read_kv_file('special_chars.txt', default={
+                '&': r'\&',
+                '%': r'\%',
+                '$': r'\$',
+                '#': r'\#',
+                '_': r'\_',
+                '{': r'\{',
+                '}': r'\}',
+                '~': r'\textasciitilde{}',
+                '^': r'\textasciicircum{}',
+                '€': r'\euro{}',
+                '<': r'\textless{}',
+                '>': r'\textgreater{}',
+                '°': r'\textdegree{}'
+            })
+        self._build_latex_translate_table()
+
         # Whitelist words for correction (loaded from file `whitelist.txt`)
-        self.CORRECTION_WHITELIST: List[str] = self._read_list_file('whitelist.txt', default=[
-            "Cm !", "Cs !", "CM !", "CS !", "F.", "le X", "CBB", "io vivat",
-            "PGCA", "CBBQ", "CMF", "XX", "XXX", "XXXX", "FM", "tapette",
-            "réunion ex", "band", "peye", "Sam’saoule"
-        ])
+        if 'CORRECTION_WHITELIST' not in self.__dict__:
+            self.CORRECTION_WHITELIST: List[str] = self._read_list_file('whitelist.txt', default=[
+                "Cm !", "Cs !", "CM !", "CS !", "F.", "le X", "CBB", "io vivat",
+                "PGCA", "CBBQ", "CMF", "XX", "XXX", "XXXX", "FM", "tapette",
+                "réunion ex", "band", "peye", "Sam’saoule"
+            ])
+        self._build_whitelist_index()
 
         # Prompt template (loaded from file `prompt.txt`)
-        self.CORRECTION_PROMPT_TEMPLATE: Optional[str] = self._read_prompt_file('prompt.txt', default=None)
-    
+        if 'CORRECTION_PROMPT_TEMPLATE' not in self.__dict__:
+            self.CORRECTION_PROMPT_TEMPLATE: Optional[str] = self._read_prompt_file('prompt.txt', default=None)
+
     def get_cohere_client(self):
-        """Retourne une instance du client Cohere."""
+        """Retourne une instance du client Cohere (créée une seule fois)."""
+        if self._cohere_client is not None:
+            return self._cohere_client
+        if not self.COHERE_API_KEY:
+            self.COHERE_API_KEY = self._load_key_from_file()
+        if not self.COHERE_API_KEY:
+            raise ValueError(
+                "Clé API Cohere introuvable. Définissez la variable d'environnement COHERE_API_KEY "
+                "ou placez la clé dans un fichier .cohere_key"
+            )
         try:
             import cohere
-            return cohere.Client(self.COHERE_API_KEY)
+            self._cohere_client = cohere.Client(self.COHERE_API_KEY)
+            return self._cohere_client
         except ImportError:
             raise ImportError("Le module 'cohere' n'est pas installé. Installez-le avec: pip install cohere")
     
-    def get_correction_prompt(self, text: str) -> str:
-        """Génère le prompt pour la correction orthographique."""
-        whitelist_str = ", ".join(self.CORRECTION_WHITELIST) if self.CORRECTION_WHITELIST else "aucun"
-
-        template = self.CORRECTION_PROMPT_TEMPLATE or (
-            "Corrige le texte suivant en français :\n"
-            "- Corrige les fautes d'orthographe, de grammaire, de ponctuation, de conjugaison et la concordance des temps.\n"
-            "- Améliore la syntaxe et la clarté.\n"
-            "- Ne modifie pas les noms propres, les anglicismes ni le latin (ex: io vivat).\n"
-            "- Ne modifie pas les mots suivants : {whitelist}.\n\n"
-            "Ta réponse doit UNIQUEMENT contenir le texte corrigé, sans explications ni commentaires.\n\n"
-            "Texte à corriger :\n\n{text}\n"
+    def api_slot(self) -> threading.BoundedSemaphore:
+        """Sémaphore à tenir pendant chaque requête à l'API de correction."""
+        return self._api_slots
+
+    def _load_key_from_file(self) -> Optional[str]:
+        """Lit la clé API Cohere depuis `.cohere_key` (à côté de config.py ou de l'exécutable)."""
+        candidates = [self._resource_path('.cohere_key')]
+        if getattr(sys, 'frozen', False):
+            candidates.append(Path(sys.executable).parent / '.cohere_key')
+        for path in candidates:
+            try:
+                key = path.read_text(encoding='utf-8').strip()
+            except (OSError, UnicodeDecodeError):
+                continue
+            if key:
+                return key
+        return None
+
+    def get_correction_prompt(self, text: str, whitelist: Optional[List[str]] = None) -> str:
+        """
+        Génère le prompt pour la correction orthographique.
+
+        Args:
+            text: Texte à corriger
+            whitelist: Mots à ne pas corriger (CORRECTION_WHITELIST si None)
+        """
+        # Le template n'est rendu (whitelist incluse) qu'une fois par couple template/whitelist ;
+        # les derniers rendus sont conservés, une whitelist ponctuelle n'évince pas celle par défaut
+        template = self.CORRECTION_PROMPT_TEMPLATE
+        if whitelist is None:
+            whitelist = self.CORRECTION_WHITELIST
+        # Config partagée entre threads : recherche et réordonnancement sous verrou
+        with self._prompt_lock:
+            for i, (cached_template, cached_whitelist, parts) in enumerate(self._prompt_parts):
+                if cached_template is template and cached_whitelist is whitelist:
+                    if i:
+                        self._prompt_parts.insert(0, self._prompt_parts.pop(i))
+                    break
+            else:
+                parts = self._render_prompt_template(template, whitelist)
+                self._prompt_parts.insert(0, (template, whitelist, parts))
+                del self._prompt_parts[_PROMPT_CACHE_SIZE:]
+        return text.join(parts)
+
+    @staticmethod
+    def _render_prompt_template(template: str, whitelist: List[str]) -> List[str]:
+        """Insère la whitelist dans le template et le découpe autour de chaque `{text}`."""
+        whitelist_str = ", ".join(whitelist) if whitelist else "aucun"
+        template = template or DEFAULT_CORRECTION_PROMPT_TEMPLATE
+
+        return [
+            part.replace("{whitelist}", whitelist_str).replace("{{", "{").replace("}}", "}")
+            for part in template.split("{text}")
+        ]
+
+    def build_latex_preamble(self) -> None:
+        """Assemble une fois pour toutes les packages et réglages LaTeX du préambule."""
+        self.LATEX_PREAMBLE = "".join(
+            f"{line}\n" for line in (*self.LATEX_PACKAGES, *self.LATEX_SETTINGS)
         )
 
-        return template.format(text=text, whitelist=whitelist_str)
+    def _compile_abbreviations(self) -> None:
+        """Précompile les motifs d'abréviations (un par un et fusionnés en un seul motif)."""
+        self.ABBREVIATIONS_COMPILED: List[Tuple[Pattern, str]] = []
+        for pattern, replacement in self.ABBREVIATIONS.items():
+            try:
+                self.ABBREVIATIONS_COMPILED.append((re.compile(pattern, re.IGNORECASE), replacement))
+            except re.error:
+                continue
+
+        # Motif fusionné : chaque abréviation est entourée d'un groupe, dont l'index
+        # (match.lastindex) permet de retrouver le remplacement en une seule passe
+        parts = []
+        self.ABBREVIATIONS_GROUPS: Dict[int, str] = {}
+        group_index = 1
+        for compiled, replacement in self.ABBREVIATIONS_COMPILED:
+            parts.append(f"({compiled.pattern})")
+            self.ABBREVIATIONS_GROUPS[group_index] = replacement
+            group_index += compiled.groups + 1
+        try:
+            self.ABBREVIATIONS_PATTERN: Optional[Pattern] = (
+                re.compile("|".join(parts), re.IGNORECASE) if parts else None
+            )
+        except re.error:
+            # Motifs incompatibles une fois fusionnés (ex: flags globaux) : passes successives
+            self.ABBREVIATIONS_PATTERN = None
+
+    def _build_latex_translate_table(self) -> None:
+        """Construit la table `str.translate` des caractères spéciaux LaTeX (clés d'un caractère)."""
+        self.LATEX_TRANSLATE_TABLE: Dict[int, str] = str.maketrans({
+            **_LATEX_BASE_ESCAPES,
+            **{
+                char: replacement
+                for char, replacement in self.LATEX_SPECIAL_CHARS.items()
+                if len(char) == 1
+            },
+        })
+        # Clés de plusieurs caractères : motif capturant (séquences les plus longues d'abord)
+        # qui découpe le texte brut, pour qu'une séquence contenant un caractère spécial
+        # soit reconnue avant lui ; None s'il n'y en a aucune
+        self.LATEX_SPECIAL_SEQUENCES: Dict[str, str] = {
+            seq: replacement
+            for seq, replacement in self.LATEX_SPECIAL_CHARS.items()
+            if len(seq) > 1
+        }
+        self.LATEX_SEQUENCES_PATTERN: Optional[Pattern] = None
+        if self.LATEX_SPECIAL_SEQUENCES:
+            keys = sorted(self.LATEX_SPECIAL_SEQUENCES, key=len, reverse=True)
+            self.LATEX_SEQUENCES_PATTERN = re.compile('(' + '|'.join(map(re.escape, keys)) + ')')
+
+    def _build_whitelist_index(self) -> None:
+        """Indexe la whitelist : ensemble insensible à la casse et motif de détection."""
+        self.CORRECTION_WHITELIST_SET = frozenset(word.casefold() for word in self.CORRECTION_WHITELIST)
+        # Entrées les plus longues d'abord pour que "XXXX" soit préféré à "XX"
+        words = sorted(self.CORRECTION_WHITELIST, key=len, reverse=True)
+        self.CORRECTION_WHITELIST_PATTERN: Optional[Pattern] = (
+            re.compile(r'(?<!\w)(?:' + '|'.join(map(re.escape, words)) + r')(?!\w)')
+            if words else None
+        )
 
     # --- Helpers pour charger les fichiers éditables ---
-    def _resource_path(self, filename: str) -> str:
-        return os.path.join(os.path.dirname(__file__), filename)
+    def _resource_path(self, filename: str) -> Path:
+        return self._base / filename
 
-    def _read_kv_file(self, filename: str, default: Dict[str, str]) -> Dict[str, str]:
-        path = self._resource_path(filename)
-        if not os.path.exists(path):
-            return default.copy()
-        result: Dict[str, str] = {}
+    def _dir_entries(self) -> Dict[str, os.DirEntry]:
+        """Liste le dossier des fichiers éditables en un seul appel (scandir)."""
         try:
-            with open(path, 'r', encoding='utf-8') as f:
-                for line in f:
-                    line = line.strip()
-                    if not line or line.startswith('#'):
-                        continue
-                    sep = '=>'
-                    if sep in line:
-                        left, right = line.split(sep, 1)
-                    elif ':' in line:
-                        left, right = line.split(':', 1)
-                    elif '=' in line:
-                        left, right = line.split('=', 1)
-                    else:
-                        continue
-                    result[left.strip()] = right.strip()
-        except Exception:
-            return default.copy()
-        return result if result else default.copy()
+            with os.scandir(self._base) as it:
+                return {entry.name: entry for entry in it}
+        except OSError:
+            return {}
 
-    def _read_list_file(self, filename: str, default: List[str]) -> List[str]:
-        path = self._resource_path(filename)
-        if not os.path.exists(path):
-            return list(default)
-        result: List[str] = []
+    def _resource_mtime(self, filename: str) -> Optional[int]:
+        """Retourne la date de modification (ns) d'un fichier éditable, None s'il est absent."""
+        entry = self._entries.get(filename)
+        if entry is None:
+            return None
         try:
-            with open(path, 'r', encoding='utf-8') as f:
-                for line in f:
-                    line = line.strip()
-                    if not line or line.startswith('#'):
-                        continue
-                    result.append(line)
-        except Exception:
-            return list(default)
-        return result if result else list(default)
+            return entry.stat().st_mtime_ns
+        except OSError:
+            return None
+
+    def _resource_changed(self, filename: str) -> bool:
+        """Indique si un fichier éditable a changé depuis sa dernière lecture."""
+        cached = self._file_cache.get(filename)
+        return cached is None or cached[0] != self._resource_mtime(filename)
+
+    def _read_cached(self, filename: str, parser: Callable[[str], Any]) -> Any:
+        """Lit et parse un fichier éditable, en réutilisant le résultat si le fichier n'a pas changé."""
+        mtime = self._resource_mtime(filename)
+        cached = self._file_cache.get(filename)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+
+        parsed = None
+        if mtime is not None:
+            try:
+                parsed = parser(self._resource_path(filename).read_text(encoding='utf-8'))
+            except (OSError, UnicodeDecodeError):
+                parsed = None
+        self._file_cache[filename] = (mtime, parsed)
+        return parsed
+
+    @staticmethod
+    def _parse_kv(data: str) -> Dict[str, str]:
+        result: Dict[str, str] = {}
+        for line in _LINE_RE.findall(data):
+            match = _KV_SPLIT.match(line)
+            if not match:
+                continue
+            left, right = (group for group in match.groups() if group is not None)
+            result[left.strip()] = right.strip()
+        return result
+
+    @staticmethod
+    def _parse_list(data: str) -> List[str]:
+        return _LINE_RE.findall(data)
+
+    def _read_kv_file(self, filename: str, default: Dict[str, str]) -> Dict[str, str]:
+        result = self._read_cached(filename, self._parse_kv)
+        return dict(result) if result else default.copy()
+
+    def _read_list_file(self, filename: str, default: List[str]) -> List[str]:
+        result = self._read_cached(filename, self._parse_list)
+        return list(result) if result else list(default)
 
     def _read_prompt_file(self, filename: str, default: Optional[str]) -> Optional[str]:
-        path = self._resource_path(filename)
-        if not os.path.exists(path):
-            return default
-        try:
-            with open(path, 'r', encoding='utf-8') as f:
-                return f.read()
-        except Exception:
-            return default
+        data = self._read_cached(filename, self._parse_prompt)
+        return default if data is None else data
+
+    @staticmethod
+    def _parse_prompt(data: str) -> str:
+        # Sans les commentaires : l'en-tête de prompt.txt cite lui-même {text}, ce qui
+        # enverrait chaque lot deux fois
+        return _COMMENT_LINE_RE.sub('', data).strip('\n')
 
     def reload_files(self) -> None:
-        """Recharge les fichiers éditables (abbreviations, special chars, whitelist, prompt)."""
-        self.ABBREVIATIONS = self._read_kv_file('abbreviations.txt', default=self.ABBREVIATIONS)
-        self.LATEX_SPECIAL_CHARS = self._read_kv_file('special_chars.txt', default=self.LATEX_SPECIAL_CHARS)
-        self.CORRECTION_WHITELIST = self._read_list_file('whitelist.txt', default=self.CORRECTION_WHITELIST)
-        self.CORRECTION_PROMPT_TEMPLATE = self._read_prompt_file('prompt.txt', default=self.CORRECTION_PROMPT_TEMPLATE)
\ No newline at end of file
+        """Recharge les fichiers éditables (abbreviations, special chars, whitelist, prompt) modifiés."""
+        if not self._resources_loaded:
+            self._load_resources()
+            return
+        self._entries = self._dir_entries()
+        if self._resource_changed('abbreviations.txt'):
+            self.ABBREVIATIONS = self._read_kv_file('abbreviations.txt', default=self.ABBREVIATIONS)
+            self._compile_abbreviations()
+        if self._resource_changed('special_chars.txt'):
+            self.LATEX_SPECIAL_CHARS = self._read_kv_file('special_chars.txt', default=self.LATEX_SPECIAL_CHARS)
+            self._build_latex_translate_table()
+        if self._resource_changed('whitelist.txt'):
+            self.CORRECTION_WHITELIST = self._read_list_file('whitelist.txt', default=self.CORRECTION_WHITELIST)
+            self._build_whitelist_index()
+        if self._resource_changed('prompt.txt'):
+            self.CORRECTION_PROMPT_TEMPLATE = self._read_prompt_file('prompt.txt', default=self.CORRECTION_PROMPT_TEMPLATE)
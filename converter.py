@@ -4,13 +4,23 @@ PATCH: Solution robuste pour macOS read-only filesystem
 """
 
 from docx import Document
+from docx.oxml.ns import nsmap, qn
+from docx.table import Table
+from docx.text.paragraph import Paragraph
+from lxml import etree
 from pathlib import Path
+import io
 import re
+import glob
+import hashlib
 import logging
 import subprocess
 import os
 import sys
+import shutil
 import tempfile
+import zipfile
+from concurrent.futures import Executor, ThreadPoolExecutor
 from typing import List, Optional, Tuple
 
 from utils import TextProcessor, DocumentParser, TableProcessor
@@ -19,21 +29,82 @@ from text_corrector import TextCorrector
 
 logger = logging.getLogger(__name__)
 
+_W_P = qn('w:p')
+
+# Images intégrées : requêtes XPath compilées une fois, évaluées directement sur l'arbre lxml
+_XPATH_BLIPS = etree.XPath('.//a:blip[@r:embed]', namespaces=nsmap)
+_XPATH_EXTENT = etree.XPath(
+    '(ancestor::wp:inline | ancestor::wp:anchor)[last()]/wp:extent', namespaces=nsmap
+)
+_R_EMBED = qn('r:embed')
+
+# Packages manquants signalés dans la sortie de pdflatex
+_RE_MISSING_STY = re.compile(r"File `([^`]+)\.sty' not found")
+
+# Messages du log LaTeX indiquant qu'une passe supplémentaire est nécessaire
+_RERUN_MARKERS = (b'Rerun to get', b'may have changed')
+_MAX_EXTRA_PASSES = 2
+
+# Fichiers auxiliaires LaTeX supprimés après compilation
+_AUX_EXTENSIONS = frozenset({'.aux', '.log', '.out', '.toc', '.fls', '.fdb_latexmk'})
+
+# Signature d'une archive ZIP (un .docx est un ZIP contenant word/document.xml)
+_ZIP_MAGIC = b'PK\x03\x04'
+
+# Préfixes de paragraphes reconnus par _process_element
+_PREFIX_PRESENTS = "Présents"
+_PREFIX_SEP = "__"
+
+# Caractères remplacés dans le nom du sous-dossier images d'un document (chemin
+# repris tel quel dans \includegraphics)
+_RE_UNSAFE_PATH_CHARS = re.compile(r'[^A-Za-z0-9_.-]+')
+
+
+def _images_subdir_name(doc_title: str) -> str:
+    """
+    Nom du sous-dossier images d'un document. Si l'assainissement modifie le titre,
+    une empreinte du titre d'origine est ajoutée : "PV 1" et "PV_1" (deux .tex distincts)
+    n'écrivent pas dans le même dossier.
+    """
+    name = _RE_UNSAFE_PATH_CHARS.sub('_', doc_title)
+    if name != doc_title:
+        name += '_' + hashlib.blake2b(doc_title.encode('utf-8'), digest_size=4).hexdigest()
+    return name
+
+# Threads d'écriture des images extraites (I/O pur, pas de contention sur le GIL)
+_IMAGE_WRITE_WORKERS = 4
+
+# Emplacements système résolus une fois à l'import
+_HOME = Path.home()
+_TMP = Path(tempfile.gettempdir())
+
+# Dossier de sortie déjà validé (évite de refaire le test d'écriture à chaque converter)
+_CACHED_OUTPUT_DIR: Optional[Path] = None
+
 def get_writable_output_dir():
     """
     Retourne un dossier accessible en écriture de manière robuste.
     Teste plusieurs emplacements et retourne le premier qui fonctionne.
+    Le résultat est mis en cache et simplement revérifié par `os.access` ensuite.
     """
+    global _CACHED_OUTPUT_DIR
+    if _CACHED_OUTPUT_DIR is not None and os.access(_CACHED_OUTPUT_DIR, os.W_OK):
+        return _CACHED_OUTPUT_DIR
+    _CACHED_OUTPUT_DIR = _find_writable_output_dir()
+    return _CACHED_OUTPUT_DIR
+
+
+def _find_writable_output_dir() -> Path:
+    """Teste les emplacements candidats par ordre de préférence (création + écriture réelle)."""
     # Liste des emplacements à tester, par ordre de préférence
     possible_dirs = []
     
     if sys.platform == 'darwin':  # macOS
-        home = Path.home()
         possible_dirs = [
-            home / "Documents" / "ConvertisseurDocxLatex",
-            home / "Desktop" / "ConvertisseurDocxLatex",
-            home / "Downloads" / "ConvertisseurDocxLatex",
-            Path(tempfile.gettempdir()) / "ConvertisseurDocxLatex",
+            _HOME / "Documents" / "ConvertisseurDocxLatex",
+            _HOME / "Desktop" / "ConvertisseurDocxLatex",
+            _HOME / "Downloads" / "ConvertisseurDocxLatex",
+            _TMP / "ConvertisseurDocxLatex",
         ]
     elif sys.platform == 'win32':  # Windows
         if getattr(sys, 'frozen', False):
@@ -44,14 +115,12 @@ def get_writable_output_dir():
             possible_dirs = [Path(__file__).parent.resolve()]
         
         # Ajouter aussi Documents comme fallback
-        home = Path.home()
-        possible_dirs.append(home / "Documents" / "ConvertisseurDocxLatex")
+        possible_dirs.append(_HOME / "Documents" / "ConvertisseurDocxLatex")
     else:  # Linux
-        home = Path.home()
         possible_dirs = [
             Path(__file__).parent.resolve(),
-            home / "Documents" / "ConvertisseurDocxLatex",
-            Path(tempfile.gettempdir()) / "ConvertisseurDocxLatex",
+            _HOME / "Documents" / "ConvertisseurDocxLatex",
+            _TMP / "ConvertisseurDocxLatex",
         ]
     
     # Tester chaque emplacement
@@ -74,12 +143,32 @@ def get_writable_output_dir():
             continue
     
     # Si aucun dossier ne fonctionne, utiliser le dossier temporaire système
-    fallback = Path(tempfile.gettempdir()) / "ConvertisseurDocxLatex"
+    fallback = _TMP / "ConvertisseurDocxLatex"
     logger.warning(f" Utilisation du dossier temporaire: {fallback}")
     fallback.mkdir(parents=True, exist_ok=True)
     return fallback
 
 
+def _validate_docx(docx_path) -> None:
+    """
+    Vérifie rapidement qu'un fichier ressemble à un .docx avant de le charger.
+
+    Seuls la signature ZIP et le répertoire central de l'archive sont lus.
+
+    Raises:
+        ValueError: Si le fichier n'est pas un document Word valide
+    """
+    try:
+        with open(docx_path, 'rb') as f:
+            if f.read(4) != _ZIP_MAGIC:
+                raise ValueError(f"'{Path(docx_path).name}' n'est pas un fichier .docx valide")
+        with zipfile.ZipFile(docx_path) as archive:
+            if 'word/document.xml' not in archive.namelist():
+                raise ValueError(f"'{Path(docx_path).name}' ne contient pas de document Word")
+    except zipfile.BadZipFile:
+        raise ValueError(f"'{Path(docx_path).name}' est une archive .docx corrompue")
+
+
 class DocxToLatexConverter:
     """Convertisseur principal de documents DocX vers LaTeX."""
     
@@ -92,6 +181,9 @@ class DocxToLatexConverter:
         
         # Déterminer le dossier de sortie une seule fois à l'initialisation
         self.output_base_dir = get_writable_output_dir()
+        self.latex_dir = self.output_base_dir / "LaTeX"
+        self.pdf_dir = self.output_base_dir / "PDF"
+        self.images_dir = self.latex_dir / "images"
         logger.info(f" Dossier de sortie configuré: {self.output_base_dir}")
     
     def convert(self, docx_path: str, latex_path: str, compile_pdf: bool = True) -> Optional[str]:
@@ -109,26 +201,32 @@ class DocxToLatexConverter:
         try:
             logger.info(f" Début de la conversion: {Path(docx_path).name}")
             
-            # Charger le document
+            # Charger le document (après une validation rapide de l'archive)
+            _validate_docx(docx_path)
             doc = Document(docx_path)
 
             # Extraire le titre du document
             doc_title = Path(docx_path).stem
 
             # Préparer dossiers de sortie
-            latex_dir = self.output_base_dir / "LaTeX"
+            latex_dir = self.latex_dir
             latex_dir.mkdir(parents=True, exist_ok=True)
-            
-            images_dir = latex_dir / "images"
-            images_dir.mkdir(parents=True, exist_ok=True)
 
             logger.info(f" Fichiers LaTeX → {latex_dir}")
 
-            # Extraire et sauvegarder les images du document
-            image_map = self._extract_images(doc, images_dir)
+            # Le dossier images n'est créé que si le document contient des images ;
+            # un sous-dossier par document évite que deux conversions simultanées
+            # n'écrasent mutuellement leurs image1.png, image2.png...
+            images_dir = self.images_dir / _images_subdir_name(doc_title)
+
+            # Les images sont écrites en arrière-plan pendant le traitement du document
+            # (correction comprise) : seule la map des chemins est nécessaire au traitement
+            with ThreadPoolExecutor(max_workers=_IMAGE_WRITE_WORKERS) as pool:
+                # Extraire et sauvegarder les images du document
+                image_map = self._extract_images(doc, images_dir, pool)
 
-            # Traiter le document
-            document_data = self._process_document(doc, doc_title, image_map)
+                # Traiter le document
+                document_data = self._process_document(doc, doc_title, image_map)
 
             # Nom du fichier .tex
             tex_filename = f"{doc_title}.tex"
@@ -144,7 +242,7 @@ class DocxToLatexConverter:
                 pdf_path = self._compile_to_pdf(str(final_latex_path))
                 if pdf_path:
                     # Créer dossier PDF
-                    pdf_dir = self.output_base_dir / "PDF"
+                    pdf_dir = self.pdf_dir
                     pdf_dir.mkdir(parents=True, exist_ok=True)
 
                     pdf_file = Path(pdf_path)
@@ -158,7 +256,6 @@ class DocxToLatexConverter:
                     except Exception as e:
                         # Fallback: copier
                         try:
-                            import shutil
                             shutil.copy2(str(pdf_file), str(target_pdf_path))
                             pdf_file.unlink()
                             pdf_result = str(target_pdf_path)
@@ -171,7 +268,7 @@ class DocxToLatexConverter:
 
             # Afficher un message de succès avec l'emplacement
             if pdf_result:
-                logger.info(f" PDF disponible dans: {self.output_base_dir / 'PDF'}")
+                logger.info(f" PDF disponible dans: {self.pdf_dir}")
                 return pdf_result
             else:
                 logger.info(f" LaTeX disponible dans: {latex_dir}")
@@ -205,73 +302,74 @@ class DocxToLatexConverter:
             
             logger.info(f"Compilation PDF: {latex_file}")
 
+            primary_cmd = retry_cmd = ['pdflatex', '-interaction=nonstopmode', latex_file.name]
+            fallback_cmd = ['lualatex', '-interaction=nonstopmode', latex_file.name]
 
-            # Première compilation
-            result = subprocess.run(
-                ['pdflatex', '-interaction=nonstopmode', latex_file.name],
-                cwd=working_dir,
-                capture_output=True,
-                text=True
-            )
-
-            combined_output = (result.stdout or '') + '\n' + (result.stderr or '')
+            # latexmk détermine lui-même le nombre de passes nécessaires
+            result = None
+            use_latexmk = shutil.which('latexmk') is not None
+            if use_latexmk:
+                result = self._run_latex(
+                    ['latexmk', '-pdf', '-interaction=nonstopmode', '-halt-on-error', latex_file.name],
+                    working_dir
+                )
+                if result.returncode != 0:
+                    # latexmk présent mais parfois inutilisable (MiKTeX sans Perl) : pdflatex
+                    # est alors lancé à la main, passes supplémentaires comprises
+                    logger.warning("latexmk failed, falling back to pdflatex")
+                    use_latexmk = False
+                    result = None
+
+            # Première compilation (sans latexmk)
+            if result is None:
+                result = self._run_latex(primary_cmd, working_dir)
+
+            # La sortie console n'est pas capturée : en cas d'échec, on analyse le .log
+            combined_output = ''
+            if result.returncode != 0:
+                combined_output = self._read_log(working_dir, file_name)
 
             # If failed, try lualatex as fallback
             if result.returncode != 0:
                 logger.warning("pdflatex failed, trying lualatex")
-                result = subprocess.run(
-                    ['lualatex', '-interaction=nonstopmode', latex_file.name],
-                    cwd=working_dir,
-                    capture_output=True,
-                    text=True
-                )
-                combined_output += '\n' + (result.stdout or '') + '\n' + (result.stderr or '')
+                result = self._run_latex(fallback_cmd, working_dir)
+                if result.returncode != 0:
+                    combined_output += '\n' + self._read_log(working_dir, file_name)
 
             # If still failed, analyze log for missing packages and retry once
             if result.returncode != 0:
                 # search for missing .sty files
-                missing = set(re.findall(r"File `([^`]+)\.sty' not found", combined_output))
+                missing = set(_RE_MISSING_STY.findall(combined_output))
                 if missing:
 
                     # Try to add \usepackage entries for missing packages (best-effort)
                     added = []
+                    existing = set(self.config.LATEX_PACKAGES)
                     for pkg in missing:
                         pkg_name = pkg.split('/')[-1]
                         usepkg = f"\\usepackage{{{pkg_name}}}"
-                        if usepkg not in self.config.LATEX_PACKAGES:
+                        if usepkg not in existing:
                             self.config.LATEX_PACKAGES.append(usepkg)
+                            existing.add(usepkg)
                             added.append(pkg_name)
 
                     if added:
+                        self.config.build_latex_preamble()
                         logger.info(f"Added missing packages to LATEX_PACKAGES: {added}. Retrying compilation.")
 
-                        # Retry pdflatex twice
-                        retry1 = subprocess.run(
-                            ['pdflatex', '-interaction=nonstopmode', latex_file.name],
-                            cwd=working_dir,
-                            capture_output=True,
-                            text=True
-                        )
-
-                        retry2 = subprocess.run(
-                            ['pdflatex', '-interaction=nonstopmode', latex_file.name],
-                            cwd=working_dir,
-                            capture_output=True,
-                            text=True
-                        )
-
-                        if retry2.returncode != 0:
+                        retry = self._run_latex(retry_cmd, working_dir)
+                        if retry.returncode != 0:
                             return None
                     else:
                         return None
 
-            # Deuxième compilation pour les références croisées (si nécessaire)
-            subprocess.run(
-                ['pdflatex', '-interaction=nonstopmode', latex_file.name],
-                cwd=working_dir,
-                capture_output=True,
-                text=True
-            )
+            # Passes supplémentaires pour les références croisées, uniquement si le log
+            # les demande (latexmk gère déjà les passes)
+            if not use_latexmk:
+                for _ in range(_MAX_EXTRA_PASSES):
+                    if not self._needs_rerun(working_dir, file_name):
+                        break
+                    self._run_latex(primary_cmd, working_dir)
 
             # Nettoyer les fichiers auxiliaires
             self._clean_auxiliary_files(working_dir, file_name)
@@ -292,6 +390,35 @@ class DocxToLatexConverter:
             logger.error(f"Erreur lors de la compilation PDF: {e}")
             return None
     
+    def _run_latex(self, cmd: List[str], working_dir: Path) -> subprocess.CompletedProcess:
+        """
+        Lance une commande de compilation LaTeX dans `working_dir`.
+
+        La sortie console (souvent volumineuse) est ignorée : tout ce qui est utile
+        se retrouve dans le fichier .log, lu uniquement quand c'est nécessaire.
+        """
+        return subprocess.run(
+            cmd,
+            cwd=working_dir,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL
+        )
+    
+    def _read_log(self, working_dir: Path, file_name: str) -> str:
+        """Retourne le contenu du .log de la dernière compilation (chaîne vide s'il est absent)."""
+        try:
+            return (working_dir / f"{file_name}.log").read_text(encoding='utf-8', errors='replace')
+        except OSError:
+            return ''
+    
+    def _needs_rerun(self, working_dir: Path, file_name: str) -> bool:
+        """Indique si le log de la dernière compilation demande une passe supplémentaire."""
+        try:
+            log = (working_dir / f"{file_name}.log").read_bytes()
+        except OSError:
+            return False
+        return any(marker in log for marker in _RERUN_MARKERS)
+    
     def _clean_auxiliary_files(self, working_dir: Path, file_name: str):
         """
         Nettoie les fichiers auxiliaires générés par LaTeX.
@@ -300,36 +427,46 @@ class DocxToLatexConverter:
             working_dir: Dossier de travail
             file_name: Nom du fichier sans extension
         """
-        extensions_to_remove = ['.aux', '.log', '.out', '.toc', '.fls', '.fdb_latexmk']
-
-        for ext in extensions_to_remove:
-            aux_file = working_dir / f"{file_name}{ext}"
-            if aux_file.exists():
+        # Un seul parcours du dossier au lieu d'un test d'existence par extension
+        for aux_file in working_dir.glob(f"{glob.escape(file_name)}.*"):
+            if aux_file.suffix in _AUX_EXTENSIONS and aux_file.stem == file_name:
                 try:
-                    aux_file.unlink()
+                    aux_file.unlink(missing_ok=True)
                 except Exception as e:
                     logger.debug(f"Impossible de supprimer {aux_file}: {e}")
 
-    def _extract_images(self, doc: Document, images_dir: Path) -> dict:
+    def _extract_images(self, doc: Document, images_dir: Path, pool: Optional[Executor] = None) -> dict:
         """
         Extrait les images présentes dans le document et les sauvegarde dans `images_dir`.
 
+        Si `pool` est fourni, les écritures y sont soumises et se terminent en arrière-plan ;
+        l'appelant doit attendre la fin du pool avant d'utiliser les fichiers.
+
         Retourne une map {rel_id: saved_path}
         """
         image_map = {}
         try:
-            for rel_id, rel in doc.part.rels.items():
+            image_rels = [
+                (rel_id, rel) for rel_id, rel in doc.part.rels.items()
+                if 'image' in rel.reltype.lower()
+            ]
+            if not image_rels:
+                return image_map
+            images_dir.mkdir(parents=True, exist_ok=True)
+            
+            for rel_id, rel in image_rels:
                 try:
-                    if 'image' in rel.reltype.lower():
-                        image_part = rel.target_part
-                        blob = getattr(image_part, 'blob', None)
-                        if not blob:
-                            continue
-                        filename = Path(image_part.partname).name
-                        target = images_dir / filename
-                        with open(target, 'wb') as f:
-                            f.write(blob)
-                        image_map[rel_id] = str(target)
+                    image_part = rel.target_part
+                    blob = getattr(image_part, 'blob', None)
+                    if not blob:
+                        continue
+                    filename = Path(image_part.partname).name
+                    target = images_dir / filename
+                    if pool is None:
+                        self._write_image(target, blob)
+                    else:
+                        pool.submit(self._write_image, target, blob)
+                    image_map[rel_id] = str(target)
                 except Exception:
                     continue
         except Exception:
@@ -337,6 +474,31 @@ class DocxToLatexConverter:
 
         return image_map
 
+    def _write_image(self, target: Path, blob: bytes):
+        """Écrit une image extraite, sauf si le fichier contient déjà ces octets."""
+        try:
+            if not self._same_file_content(target, blob):
+                with open(target, 'wb') as f:
+                    f.write(blob)
+        except Exception as e:
+            logger.warning(f"Impossible d'écrire l'image {target.name}: {e}")
+
+    @staticmethod
+    def _same_file_content(target: Path, blob: bytes) -> bool:
+        """
+        Indique si `target` contient déjà exactement `blob` (reconversion d'un même document).
+
+        Une nouvelle version du document (ou un homonyme d'un autre dossier) réutilise les
+        mêmes noms image1.png... : la taille seule ne suffit pas, le contenu n'est comparé
+        que lorsque les tailles concordent.
+        """
+        try:
+            if target.stat().st_size != len(blob):
+                return False
+            return target.read_bytes() == blob
+        except OSError:
+            return False
+
     def _emu_to_cm(self, emu: int) -> float:
         """Convertit une valeur EMU (English Metric Unit) en centimètres."""
         try:
@@ -361,33 +523,31 @@ class DocxToLatexConverter:
             'present_names': [],
             'sections_list': [],
             'subsections_list': [],
-            'first_text': None,
-            'tables': list(doc.tables)
+            'first_text': None
         }
         
-        # Extraire la liste des sections
-        data['sections_list'], data['subsections_list'] = DocumentParser.extract_sections_list(doc.paragraphs)
-        
         # Collecter les paragraphes pour correction
         paragraphs_to_correct = []
         
         # Variables de suivi d'état
-        table_index = 0
         in_present_section = False
         present_names_buffer = []
         
-        # Parcourir les éléments du document
-        for element in doc.element.body:
+        # Parcourir les éléments du document (un seul passage, sections extraites au vol)
+        for element, para in self._walk_body(doc):
+            if para is not None:
+                DocumentParser.collect_section_header(
+                    para.text, data['sections_list'], data['subsections_list']
+                )
+            
             element_data = self._process_element(
-                element, doc, data, 
-                table_index, in_present_section, 
+                element, para, doc, data, 
+                in_present_section, 
                 present_names_buffer, paragraphs_to_correct,
                 image_map or {}
             )
             
             if element_data:
-                if 'table_index' in element_data:
-                    table_index = element_data['table_index']
                 if 'in_present_section' in element_data:
                     in_present_section = element_data['in_present_section']
                 if 'present_names' in element_data:
@@ -400,9 +560,22 @@ class DocxToLatexConverter:
         
         return data
     
+    def _walk_body(self, doc: Document):
+        """
+        Parcourt une seule fois les enfants directs du corps du document.
+        
+        Yields:
+            Tuples (élément, paragraphe) ; le paragraphe vaut None pour les autres éléments
+        """
+        for element in doc.element.body.iterchildren():
+            if element.tag == _W_P:
+                yield element, Paragraph(element, doc.part)
+            else:
+                yield element, None
+    
     def _process_element(
-        self, element, doc: Document, data: dict,
-        table_index: int, in_present_section: bool,
+        self, element, para: Optional[Paragraph], doc: Document, data: dict,
+        in_present_section: bool,
         present_names_buffer: List[str],
         paragraphs_to_correct: List,
         image_map: dict
@@ -416,50 +589,29 @@ class DocxToLatexConverter:
         result = {}
         
         if element.tag.endswith("tbl"):
-            # Traiter un tableau
-            if table_index < len(data['tables']):
-                table = data['tables'][table_index]
-                result['table_index'] = table_index + 1
-                
-                table_data = self.table_processor.extract_table_data(
-                    table, self.text_processor
-                )
-                table_data = self.table_processor.remove_duplicate_columns(table_data)
-                
-                data['elements'].append({
-                    'type': 'table',
-                    'data': table_data
-                })
+            # Traiter un tableau (construit à la demande, doc.tables n'est jamais énuméré)
+            table = Table(element, doc.part)
+            
+            table_data = self.table_processor.extract_table_data(
+                table, self.text_processor
+            )
+            table_data = self.table_processor.remove_duplicate_columns(table_data)
+            
+            data['elements'].append({
+                'type': 'table',
+                'data': table_data
+            })
         
         elif element.tag.endswith("p"):
             # Détecter les images intégrées via r:embed dans l'XML de l'élément
-            try:
-                xml = element.xml
-                rids = re.findall(r'r:embed="(rId[0-9]+)"', xml)
-                # extraire listes cx et cy (EMU)
-                cx_list = re.findall(r'cx="(\d+)"', xml)
-                cy_list = re.findall(r'cy="(\d+)"', xml)
-
-                for idx, rid in enumerate(rids):
-                    if rid in image_map:
-                        img_entry = {'type': 'image', 'path': image_map[rid]}
-                        try:
-                            cx = int(cx_list[idx]) if idx < len(cx_list) else None
-                            cy = int(cy_list[idx]) if idx < len(cy_list) else None
-                        except Exception:
-                            cx = cy = None
-
-                        if cx and cy:
-                            # convertir EMU -> cm
-                            img_entry['width_cm'] = self._emu_to_cm(cx)
-                            img_entry['height_cm'] = self._emu_to_cm(cy)
-
-                        data['elements'].append(img_entry)
-            except Exception:
-                pass
+            # (inutile si le document ne contient aucune image)
+            if image_map:
+                try:
+                    data['elements'].extend(self._find_inline_images(element, image_map))
+                except Exception:
+                    pass
 
             # Traiter un paragraphe
-            para = next((p for p in doc.paragraphs if p._element == element), None)
             if not para:
                 return None
             
@@ -474,13 +626,18 @@ class DocxToLatexConverter:
                 })
                 return result
             
+            # Préfixes testés une seule fois : comparaison courte sur les deux premiers
+            # caractères avant le startswith complet
+            first2 = text[:2]
+            is_separator = first2 == _PREFIX_SEP
+            
             # Gestion de la section "Présents"
-            if text.startswith("Présents"):
+            if first2 == _PREFIX_PRESENTS[:2] and text.startswith(_PREFIX_PRESENTS):
                 result['in_present_section'] = True
                 return result
             
             if in_present_section:
-                if not text or text.startswith("__"):
+                if not text or is_separator:
                     # Fin de la section présents
                     result['in_present_section'] = False
                     result['present_names'] = present_names_buffer.copy()
@@ -490,7 +647,7 @@ class DocxToLatexConverter:
                         'names': present_names_buffer.copy()
                     })
                     
-                    if text.startswith("__"):
+                    if is_separator:
                         data['elements'].append({
                             'type': 'start_text',
                             'text': text
@@ -528,6 +685,36 @@ class DocxToLatexConverter:
         
         return result
     
+    def _find_inline_images(self, element, image_map: dict) -> List[dict]:
+        """
+        Retourne les images intégrées (r:embed) d'un paragraphe, avec leurs dimensions en cm.
+        
+        Args:
+            element: Élément XML du paragraphe
+            image_map: Map {rel_id: chemin de l'image extraite}
+        """
+        images = []
+        for blip in _XPATH_BLIPS(element):
+            rid = blip.get(_R_EMBED)
+            if rid in image_map:
+                img_entry = {'type': 'image', 'path': image_map[rid]}
+
+                # dimensions (EMU) portées par le wp:extent du dessin englobant
+                extents = _XPATH_EXTENT(blip)
+                try:
+                    cx = int(extents[0].get('cx')) if extents else None
+                    cy = int(extents[0].get('cy')) if extents else None
+                except (TypeError, ValueError):
+                    cx = cy = None
+
+                if cx and cy:
+                    # convertir EMU -> cm
+                    img_entry['width_cm'] = self._emu_to_cm(cx)
+                    img_entry['height_cm'] = self._emu_to_cm(cy)
+
+                images.append(img_entry)
+        return images
+    
     def _write_latex_file(self, latex_path: str, data: dict):
         """
         Écrit le fichier LaTeX à partir des données traitées.
@@ -536,10 +723,11 @@ class DocxToLatexConverter:
             latex_path: Chemin du fichier LaTeX de sortie
             data: Données traitées du document
         """
-        with open(latex_path, 'w', encoding='utf-8') as latex_file:
+        # Tout est assemblé en mémoire puis écrit en une seule fois
+        with io.StringIO() as buf:
             # En-tête du document
-            latex_file.write(self.latex_generator.generate_document_header())
-            latex_file.write(self.latex_generator.generate_title_header(data['title']) + "\n\n")
+            buf.write(self.latex_generator.generate_document_header())
+            buf.write(self.latex_generator.generate_title_header(data['title']) + "\n\n")
             
             # Variable pour suivre si on a déjà inséré la TOC et le logo
             toc_inserted = False
@@ -550,20 +738,20 @@ class DocxToLatexConverter:
                 elem_type = element['type']
                 
                 if elem_type == 'title':
-                    latex_file.write(
+                    buf.write(
                         self.latex_generator.generate_title_section(element['text'])
                     )
                 
                 elif elem_type == 'table':
-                    latex_file.write(
+                    buf.write(
                         self.latex_generator.generate_table(element['data'])
                     )
                 elif elem_type == 'image':
                     img_path = element.get('path')
                     if img_path:
-                        # Chemin relatif (images/filename) par rapport au .tex
-                        img_name = Path(img_path).name
-                        rel_path = Path('images') / img_name
+                        # Chemin relatif (images/<document>/filename) par rapport au .tex
+                        img_file = Path(img_path)
+                        rel_path = Path('images') / img_file.parent.name / img_file.name
                         width_cm = element.get('width_cm')
                         height_cm = element.get('height_cm')
 
@@ -575,9 +763,9 @@ class DocxToLatexConverter:
 
                         opt_str = f"[{','.join(opts)}]" if opts else ""
 
-                        latex_file.write("\\begin{figure}[h]\n\\centering\n")
-                        latex_file.write(f"\\includegraphics{opt_str}{{{rel_path.as_posix()}}}\n")
-                        latex_file.write("\\end{figure}\n\n")
+                        buf.write("\\begin{figure}[h]\n\\centering\n")
+                        buf.write(f"\\includegraphics{opt_str}{{{rel_path.as_posix()}}}\n")
+                        buf.write("\\end{figure}\n\n")
                 
                 elif elem_type == 'present_section':
                     names = [name.strip() for name in element['names'] if name.strip()]
@@ -588,7 +776,7 @@ class DocxToLatexConverter:
                             name = name[1:].strip()
                         cleaned_names.append(name)
                     
-                    latex_file.write(
+                    buf.write(
                         self.latex_generator.generate_present_section(cleaned_names)
                     )
                     present_inserted = True
@@ -596,8 +784,8 @@ class DocxToLatexConverter:
                 elif elem_type == 'start_text' or present_inserted:
                     # Insérer la TOC et le logo avant le texte de début
                     if not toc_inserted and data['sections_list']:
-                        latex_file.write(self.latex_generator.generate_toc(data['sections_list'], data['subsections_list']))
-                        latex_file.write(self.latex_generator.generate_logo_section())
+                        buf.write(self.latex_generator.generate_toc(data['sections_list'], data['subsections_list']))
+                        buf.write(self.latex_generator.generate_logo_section())
                         toc_inserted = True
                     
 
@@ -605,20 +793,23 @@ class DocxToLatexConverter:
                 
                 elif elem_type == 'section':
                     para = element['paragraph']
-                    latex_file.write(self.latex_generator.generate_section(element['title']))
+                    buf.write(self.latex_generator.generate_section(element['title']))
 
                 elif elem_type == 'subsection':
                     para = element['paragraph']
-                    latex_file.write(self.latex_generator.generate_subsection(element['title']))
+                    buf.write(self.latex_generator.generate_subsection(element['title']))
                 
                 elif elem_type == 'paragraph':
                     para = element['paragraph']
         
-                    latex_file.write(self._format_paragraph_with_runs(para))
+                    buf.write(self._format_paragraph_with_runs(para))
 
             
             # Pied de page du document
-            latex_file.write(self.latex_generator.generate_document_footer())
+            buf.write(self.latex_generator.generate_document_footer())
+            
+            with open(latex_path, 'w', encoding='utf-8') as latex_file:
+                latex_file.write(buf.getvalue())
     
     def _format_paragraph_with_runs(self, para, ndlr=True) -> str:
         """
@@ -630,33 +821,41 @@ class DocxToLatexConverter:
         Returns:
             Texte LaTeX formaté
         """
-        latex_text = ""
+        parts_latex = []
         text = para.text.strip()
+        runs = para.runs
         fail = False
 
         if ":" in text:
             parts = para.text.split(":", 1)
             if len(parts) == 2:
                 brut_bold_part = parts[0].strip()
-                bold_part = f"\\textbf{{{self.text_processor.escape_latex(brut_bold_part)}}}"
-                for i in range(len(para.runs)):
+                bold_part = f"\\textbf{{{self.text_processor.prepare(brut_bold_part)}}}"
+                label_removed = False
+                for i, run in enumerate(runs):
                     type = []
-                    run = para.runs[i]
                     if i == 0:
                         type.append("begin")
-                    if i == len(para.runs) - 1:
+                    if i == len(runs) - 1:
                         type.append("end")
 
                     remaining = run.text.strip()
-                    if brut_bold_part in remaining:
-                        remaining = remaining.replace(brut_bold_part, "")
-                        remaining = remaining.replace(":", "", 1).strip()
+                    # Le libellé est presque toujours en tête du premier run :
+                    # inutile de le rechercher dans les runs suivants une fois retiré
+                    if not label_removed:
+                        if i == 0 and remaining.startswith(brut_bold_part):
+                            remaining = remaining[len(brut_bold_part):]
+                            remaining = remaining.replace(":", "", 1).strip()
+                            label_removed = True
+                        elif brut_bold_part in remaining:
+                            remaining = remaining.replace(brut_bold_part, "")
+                            remaining = remaining.replace(":", "", 1).strip()
+                            label_removed = True
                         
                     if remaining.startswith(":"):
                         remaining = remaining[1:].strip()
 
-                    remaining = self.text_processor.escape_latex(remaining)
-                    remaining = self.text_processor.replace_abbreviations(remaining, type=type)
+                    remaining = self.text_processor.prepare(remaining, abbrev=True, type=type)
 
 
                     if run.bold:
@@ -666,9 +865,9 @@ class DocxToLatexConverter:
                         bold_part = f"\\textit{{{bold_part}}}"
                     
                     if remaining:
-                        latex_text += remaining
+                        parts_latex.append(remaining)
 
-                latex_text = latex_text.replace("\\textit{}", "")
+                latex_text = "".join(parts_latex).replace("\\textit{}", "")
                 return f"{bold_part} : {latex_text.strip()}\n\n"
             else:
                 fail = True
@@ -677,12 +876,11 @@ class DocxToLatexConverter:
         
 
         if fail:
-            for run in para.runs:
+            for run in runs:
             
                 run_text = run.text.strip()
 
-                run_text = self.text_processor.escape_latex(run_text)
-                run_text = self.text_processor.replace_abbreviations(run_text)
+                run_text = self.text_processor.prepare(run_text, abbrev=True)
                 
                 if run.bold:
                     run_text = f"\\textbf{{{run_text}}}"
@@ -690,7 +888,8 @@ class DocxToLatexConverter:
                     run_text = f"\\textit{{{run_text}}}"
                 
                 if run_text:
-                    latex_text += run_text + " "
+                    parts_latex.append(run_text)
                     
             
+        latex_text = " ".join(parts_latex)
         return latex_text.strip() + "\n\n" if latex_text.strip() else ""
\ No newline at end of file
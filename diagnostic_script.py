@@ -5,27 +5,68 @@ test_write_access.py - Script de diagnostic pour tester les permissions d'écrit
 
 import sys
 import os
+import functools
 from pathlib import Path
 import tempfile
 
-def test_write_access(directory):
-    """Teste si un dossier est accessible en écriture."""
+@functools.lru_cache(maxsize=64)
+def _probe_write_access(directory: str):
+    """
+    Sonde l'écriture dans un dossier (création + suppression d'un fichier vide).
+
+    Le résultat est mémorisé par dossier. Retourne None si le dossier est accessible,
+    sinon l'exception rencontrée.
+    """
     try:
-        directory = Path(directory)
-        directory.mkdir(parents=True, exist_ok=True)
-        
-        # Tenter d'écrire un fichier test
-        test_file = directory / ".write_test"
-        test_file.write_text("test")
-        content = test_file.read_text()
-        test_file.unlink()
+        Path(directory).mkdir(parents=True, exist_ok=True)
         
+        # Créer puis supprimer un fichier vide suffit à prouver l'accès (pas de relecture)
+        test_file = os.path.join(directory, ".write_test")
+        fd = os.open(test_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        os.close(fd)
+        os.unlink(test_file)
+        return None
+    except OSError as e:
+        return e
+
+def test_write_access(directory):
+    """Teste si un dossier est accessible en écriture."""
+    directory = Path(directory)
+    error = _probe_write_access(str(directory))
+    
+    if error is None:
         print(f" {directory}")
         return True
-    except Exception as e:
-        print(f" {directory}")
-        print(f"   Erreur: {e}")
-        return False
+    
+    print(f" {directory}")
+    print(f"   Erreur: {error}")
+    return False
+
+@functools.lru_cache(maxsize=64)
+def _can_create_in(location: str) -> bool:
+    """
+    Indique si `location` existe déjà ou si son plus proche parent existant est
+    accessible en écriture (simple os.access, aucun mkdir).
+    """
+    path = Path(location)
+    while not path.exists():
+        if path.parent == path:
+            return False
+        path = path.parent
+    return path == Path(location) or os.access(path, os.W_OK)
+
+# Emplacements testés par plateforme : (nom, fonction(home, temp) -> dossier)
+_LOCATIONS_DARWIN = (
+    ("Documents", lambda home, temp: home / "Documents" / "ConvertisseurDocxLatex"),
+    ("Desktop", lambda home, temp: home / "Desktop" / "ConvertisseurDocxLatex"),
+    ("Downloads", lambda home, temp: home / "Downloads" / "ConvertisseurDocxLatex"),
+    ("Temp système", lambda home, temp: temp / "ConvertisseurDocxLatex"),
+)
+
+_LOCATIONS_WIN32 = (
+    ("Documents", lambda home, temp: home / "Documents" / "ConvertisseurDocxLatex"),
+    ("Temp système", lambda home, temp: temp / "ConvertisseurDocxLatex"),
+)
 
 def main():
     print("=" * 60)
@@ -45,16 +86,12 @@ def main():
     print()
     
     home = Path.home()
+    temp = Path(tempfile.gettempdir())
     
     test_locations = []
     
     if sys.platform == 'darwin':  # macOS
-        test_locations = [
-            ("Documents", home / "Documents" / "ConvertisseurDocxLatex"),
-            ("Desktop", home / "Desktop" / "ConvertisseurDocxLatex"),
-            ("Downloads", home / "Downloads" / "ConvertisseurDocxLatex"),
-            ("Temp système", Path(tempfile.gettempdir()) / "ConvertisseurDocxLatex"),
-        ]
+        test_locations = [(name, make(home, temp)) for name, make in _LOCATIONS_DARWIN]
         
         # Si on est dans un bundle
         if getattr(sys, 'frozen', False):
@@ -73,13 +110,18 @@ def main():
                 ("À côté du script", script_dir),
             ]
         
-        test_locations.append(("Documents", home / "Documents" / "ConvertisseurDocxLatex"))
-        test_locations.append(("Temp système", Path(tempfile.gettempdir()) / "ConvertisseurDocxLatex"))
+        test_locations.extend((name, make(home, temp)) for name, make in _LOCATIONS_WIN32)
     
     results = []
     for name, location in test_locations:
         print(f"Test: {name}")
-        success = test_write_access(location)
+        if _can_create_in(str(location)):
+            success = test_write_access(location)
+        else:
+            # Inutile de tenter un mkdir sous un dossier en lecture seule
+            print(f" {location}")
+            print("   Erreur: dossier parent non accessible en écriture")
+            success = False
         results.append((name, location, success))
         print()
     
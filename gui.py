@@ -8,6 +8,7 @@ from tkinterdnd2 import TkinterDnD, DND_FILES
 from pathlib import Path
 import threading
 import queue
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor, as_completed
 import sys
 import io
 from datetime import datetime
@@ -20,22 +21,28 @@ from config import Config
 class TextRedirector(io.StringIO):
     """Redirige les print vers l'interface graphique."""
     
-    def __init__(self, text_widget, tag=""):
+    def __init__(self, target_queue, tag=""):
         super().__init__()
-        self.text_widget = text_widget
+        # Les écritures (souvent depuis un thread de conversion) passent par la file des
+        # mises à jour : seul _drain_queue, sur le thread principal, touche à Tk
+        self.target_queue = target_queue
         self.tag = tag
     
     def write(self, string):
-        self.text_widget.configure(state='normal')
-        self.text_widget.insert(tk.END, string, (self.tag,))
-        self.text_widget.configure(state='disabled')
-        self.text_widget.see(tk.END)
-        self.text_widget.update()
+        if string:
+            self.target_queue.put(('log', string, self.tag))
+        return len(string)
 
 
 class ConverterGUI:
     """Interface graphique pour le convertisseur DocX vers LaTeX."""
     
+    # Intervalle de vidage de la file des mises à jour de l'interface (ms)
+    QUEUE_POLL_MS = 100
+    
+    # Nombre maximal de fichiers convertis simultanément
+    MAX_PARALLEL_CONVERSIONS = 4
+    
     def __init__(self):
         # Créer la fenêtre principale avec support du drag and drop
         self.root = TkinterDnD.Tk()
@@ -49,8 +56,19 @@ class ConverterGUI:
         
         # Files à traiter
         self.files_to_process = []
+        self._files_set = set()  # mêmes chemins que files_to_process, pour un test d'appartenance en O(1)
         self.processing = False
         self.process_queue = queue.Queue()
+        self._thread_local = threading.local()
+        
+        # Un seul thread de conversion, alimenté par job_queue, et un pool persistant
+        # (les convertisseurs propres à chaque thread du pool sont ainsi réutilisés)
+        self.job_queue = queue.Queue()
+        self._executor = ThreadPoolExecutor(
+            max_workers=min(self.MAX_PARALLEL_CONVERSIONS, os.cpu_count() or 1)
+        )
+        threading.Thread(target=self._worker_loop, daemon=True).start()
+        self.root.protocol("WM_DELETE_WINDOW", self._on_close)
         
         # Configurer le style
         self.setup_styles()
@@ -66,30 +84,38 @@ class ConverterGUI:
         
         # Rediriger les prints
         self.redirect_output()
+        
+        # Les mises à jour de l'interface (logs, statut, progression) passent par
+        # process_queue et sont appliquées par lots depuis le thread principal
+        self.root.after(self.QUEUE_POLL_MS, self._drain_queue)
 
     
     def show_output_location(self):
         """Affiche l'emplacement des fichiers de sortie."""
-        output_dir = self.converter.output_base_dir
-        
-        # Créer un message formaté
-        location_msg = f"\n{'='*50}\n"
-        location_msg += " EMPLACEMENT DES FICHIERS DE SORTIE\n"
-        location_msg += f"{'='*50}\n"
-        location_msg += f"Dossier principal: {output_dir}\n"
-        location_msg += f"Fichiers LaTeX (.tex): {output_dir / 'LaTeX'}\n"
-        location_msg += f"Fichiers PDF: {output_dir / 'PDF'}\n"
-        location_msg += f"Images: {output_dir / 'LaTeX' / 'images'}\n"
-        location_msg += f"{'='*50}\n\n"
-        
-        self.log_message(location_msg, 'info')
+        converter = self.converter
+        separator = '=' * 50
+        
+        # Un seul message (une seule insertion dans la zone de log)
+        location_msg = f"""
+{separator}
+ EMPLACEMENT DES FICHIERS DE SORTIE
+{separator}
+Dossier principal: {converter.output_base_dir}
+Fichiers LaTeX (.tex): {converter.latex_dir}
+Fichiers PDF: {converter.pdf_dir}
+Images: {converter.images_dir}
+{separator}
+
+"""
         
         # Sur macOS, proposer d'ouvrir le dossier
         if sys.platform == 'darwin':
-            self.log_message(" Astuce: Pour ouvrir ce dossier:", 'info')
-            self.log_message(f"   1. Ouvrez le Finder", 'info')
-            self.log_message(f"   2. Cmd+Shift+G puis collez: {output_dir}", 'info')
-            self.log_message("", 'info')
+            location_msg += f""" Astuce: Pour ouvrir ce dossier:
+   1. Ouvrez le Finder
+   2. Cmd+Shift+G puis collez: {converter.output_base_dir}
+"""
+        
+        self.log_message(location_msg, 'info')
     
     def setup_styles(self):
         """Configure les styles de l'interface."""
@@ -317,13 +343,15 @@ class ConverterGUI:
     def add_files(self, files):
         """Ajoute des fichiers à la liste."""
         for file_path in files:
-            if file_path.endswith('.docx'):
-                if file_path not in self.files_to_process:
+            name = Path(file_path).name
+            if os.path.splitext(file_path)[1].lower() == '.docx':
+                if file_path not in self._files_set:
+                    self._files_set.add(file_path)
                     self.files_to_process.append(file_path)
-                    self.file_listbox.insert(tk.END, Path(file_path).name)
-                    self.log_message(f"Fichier ajouté: {Path(file_path).name}", 'info')
+                    self.file_listbox.insert(tk.END, name)
+                    self.log_message(f"Fichier ajouté: {name}", 'info')
             else:
-                self.log_message(f"Fichier ignoré (pas un .docx): {Path(file_path).name}", 'warning')
+                self.log_message(f"Fichier ignoré (pas un .docx): {name}", 'warning')
         
         # Activer le bouton convertir si des fichiers sont présents
         if self.files_to_process:
@@ -332,12 +360,13 @@ class ConverterGUI:
     def clear_selection(self):
         """Efface la sélection de fichiers."""
         self.files_to_process.clear()
+        self._files_set.clear()
         self.file_listbox.delete(0, tk.END)
         self.convert_btn.configure(state=tk.DISABLED)
         self.log_message("Sélection effacée", 'info')
     
     def start_conversion(self):
-        """Lance la conversion dans un thread séparé."""
+        """Confie les fichiers sélectionnés au thread de conversion."""
         if not self.files_to_process or self.processing:
             return
         
@@ -345,15 +374,24 @@ class ConverterGUI:
         self.convert_btn.configure(state=tk.DISABLED)
         self.browse_btn.configure(state=tk.DISABLED)
         self.clear_btn.configure(state=tk.DISABLED)
+        self.progress['maximum'] = len(self.files_to_process)
         
-        # Lancer dans un thread séparé
-        thread = threading.Thread(target=self.process_files, daemon=True)
-        thread.start()
+        # Copie : la sélection peut être modifiée pendant la conversion
+        self.job_queue.put(list(self.files_to_process))
+    
+    def _worker_loop(self):
+        """Thread de conversion unique : traite les lots de fichiers reçus via job_queue."""
+        while True:
+            files = self.job_queue.get()
+            try:
+                self.process_files(files)
+            except Exception as e:
+                self.log_message(f"✗ Erreur inattendue: {e}", 'error')
+                self.process_queue.put(('done',))
     
-    def process_files(self):
-        """Traite tous les fichiers sélectionnés."""
-        total_files = len(self.files_to_process)
-        self.progress['maximum'] = total_files
+    def process_files(self, files):
+        """Traite une liste de fichiers (appelé depuis le thread de conversion)."""
+        total_files = len(files)
         
         self.log_message(f"\n{'='*50}", 'info')
         self.log_message(f"Début de la conversion de {total_files} fichier(s)", 'info')
@@ -365,21 +403,36 @@ class ConverterGUI:
         success_count = 0
         error_count = 0
         
-        for i, file_path in enumerate(self.files_to_process, 1):
-            file_name = Path(file_path).stem
-            self.update_status(f"Conversion {i}/{total_files}: {Path(file_path).name}")
-            
-            self.log_message(f"\n[{i}/{total_files}] Conversion de: {Path(file_path).name}", 'info')
+        # Les fichiers sont indépendants et la compilation LaTeX domine : conversions en parallèle,
+        # sauf entre fichiers de même nom (a/PV.docx, b/PV.docx) qui partagent .tex, .aux, .pdf
+        # et dossier images : chacun n'est soumis qu'à la fin du précédent de même nom
+        futures = {}
+        last_by_stem = {}
+        for i, file_path in enumerate(files, 1):
+            p = Path(file_path)
+            latex_path = p.with_suffix('.tex')
+            self.log_message(f"\n[{i}/{total_files}] Conversion de: {p.name}", 'info')
+            stem_key = p.stem.casefold()  # systèmes de fichiers Windows/macOS insensibles à la casse
+            previous = last_by_stem.get(stem_key)
+            if previous is None:
+                future = self._executor.submit(self._convert_file, file_path, str(latex_path))
+            else:
+                future = self._submit_after(previous, file_path, str(latex_path))
+            last_by_stem[stem_key] = future
+            futures[future] = (p.name, latex_path.name)
+        
+        for done, future in enumerate(as_completed(futures), 1):
+            name, latex_name = futures[future]
+            self.update_status(f"Conversion {done}/{total_files} terminée: {name}")
             
             try:
-                # Conversion
-                latex_path = str(Path(file_path).with_suffix('.tex'))
-                pdf_result = self.converter.convert(file_path, latex_path, compile_pdf=True)
+                pdf_result = future.result()
 
-                self.log_message(f"✓ Conversion réussie: {Path(latex_path).name}", 'success')
+                self.log_message(f"✓ Conversion réussie: {latex_name}", 'success')
 
-                if pdf_result and Path(pdf_result).exists():
-                    self.log_message(f"✓ PDF généré: {Path(pdf_result).name}", 'success')
+                pdf_file = Path(pdf_result) if pdf_result else None
+                if pdf_file and pdf_file.exists():
+                    self.log_message(f"✓ PDF généré: {pdf_file.name}", 'success')
                 else:
                     self.log_message("⚠ PDF non généré (LaTeX non installé?)", 'warning')
 
@@ -387,12 +440,11 @@ class ConverterGUI:
                 success_count += 1
                 
             except Exception as e:
-                self.log_message(f"✗ Erreur lors de la conversion: {str(e)}", 'error')
+                self.log_message(f"✗ Erreur lors de la conversion de {name}: {str(e)}", 'error')
                 error_count += 1
             
             # Mise à jour de la progression
-            self.progress['value'] = i
-            self.root.update_idletasks()
+            self.process_queue.put(('progress', done))
         
         # Résumé final
         self.log_message(f"\n{'='*50}", 'info')
@@ -402,26 +454,112 @@ class ConverterGUI:
         
         self.update_status("Conversion terminée")
         
-        # Réactiver les boutons
+        # Réactiver les boutons (depuis le thread principal)
+        self.process_queue.put(('done',))
+    
+    def _submit_after(self, previous, file_path, latex_path):
+        """
+        Soumet la conversion de `file_path` au pool une fois `previous` terminée, sans
+        occuper de thread du pool pendant l'attente.
+        
+        Returns:
+            Future reflétant le résultat de la conversion
+        """
+        chained = Future()
+        chained.set_running_or_notify_cancel()
+        
+        def relay(inner):
+            if inner.cancelled():
+                chained.set_exception(CancelledError())
+            elif inner.exception() is not None:
+                chained.set_exception(inner.exception())
+            else:
+                chained.set_result(inner.result())
+        
+        def start(_):
+            try:
+                inner = self._executor.submit(self._convert_file, file_path, latex_path)
+            except RuntimeError as e:  # pool arrêté (fenêtre fermée)
+                chained.set_exception(e)
+                return
+            inner.add_done_callback(relay)
+        
+        previous.add_done_callback(start)
+        return chained
+    
+    def _convert_file(self, file_path, latex_path):
+        """
+        Convertit un fichier dans un thread du pool, avec un convertisseur propre au thread.
+        
+        Returns:
+            Résultat de la conversion (chemin du PDF ou du .tex généré)
+        """
+        converter = getattr(self._thread_local, 'converter', None)
+        if converter is None:
+            converter = DocxToLatexConverter(self.config)
+            self._thread_local.converter = converter
+        
+        return converter.convert(file_path, latex_path, compile_pdf=True)
+    
+    def _on_close(self):
+        """Ferme la fenêtre en abandonnant les conversions pas encore commencées."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self.root.destroy()
+    
+    def _finish_conversion(self):
+        """Réactive l'interface à la fin de la conversion."""
         self.processing = False
         self.convert_btn.configure(state=tk.NORMAL)
         self.browse_btn.configure(state=tk.NORMAL)
         self.clear_btn.configure(state=tk.NORMAL)
         self.progress['value'] = 0
     
+    def _drain_queue(self):
+        """Applique en une fois toutes les mises à jour en attente, puis se replanifie."""
+        log_segments = []
+        status = None
+        progress = None
+        done = False
+        
+        while True:
+            try:
+                event = self.process_queue.get_nowait()
+            except queue.Empty:
+                break
+            kind = event[0]
+            if kind == 'log':
+                log_segments.extend((event[1], event[2]))
+            elif kind == 'status':
+                status = event[1]
+            elif kind == 'progress':
+                progress = event[1]
+            elif kind == 'done':
+                done = True
+        
+        if log_segments:
+            # Une seule insertion : Text.insert accepte une suite (texte, tag, texte, tag, ...)
+            self.log_text.configure(state='normal')
+            self.log_text.insert(tk.END, *log_segments)
+            self.log_text.configure(state='disabled')
+            self.log_text.see(tk.END)
+        if status is not None:
+            self.status_label.configure(text=status)
+        if progress is not None:
+            self.progress['value'] = progress
+        if done:
+            self._finish_conversion()
+        
+        self.root.after(self.QUEUE_POLL_MS, self._drain_queue)
+    
     def log_message(self, message, tag='info'):
-        """Affiche un message dans la zone de log."""
+        """Affiche un message dans la zone de log (utilisable depuis n'importe quel thread)."""
         timestamp = datetime.now().strftime("%H:%M:%S")
         formatted_message = f"[{timestamp}] {message}\n"
-        
-        self.log_text.configure(state='normal')
-        self.log_text.insert(tk.END, formatted_message, tag)
-        self.log_text.configure(state='disabled')
-        self.log_text.see(tk.END)
+        self.process_queue.put(('log', formatted_message, tag))
     
     def update_status(self, message):
-        """Met à jour le label de statut."""
-        self.status_label.configure(text=message)
+        """Met à jour le label de statut (utilisable depuis n'importe quel thread)."""
+        self.process_queue.put(('status', message))
     
     def center_window(self):
         """Centre la fenêtre sur l'écran."""
@@ -434,8 +572,8 @@ class ConverterGUI:
     
     def redirect_output(self):
         """Redirige stdout et stderr vers la zone de log."""
-        sys.stdout = TextRedirector(self.log_text, "info")
-        sys.stderr = TextRedirector(self.log_text, "error")
+        sys.stdout = TextRedirector(self.process_queue, "info")
+        sys.stderr = TextRedirector(self.process_queue, "error")
     
     def run(self):
         """Lance l'interface graphique."""
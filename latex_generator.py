@@ -2,7 +2,8 @@
 latex_generator.py - Générateur de code LaTeX
 """
 
-from typing import List, Dict, Optional
+import io
+from typing import List, Dict, Optional, Tuple
 from utils import TextProcessor, DocumentParser
 import logging
 
@@ -15,16 +16,16 @@ class LaTeXGenerator:
     def __init__(self, config, text_processor: TextProcessor):
         self.config = config
         self.text_processor = text_processor
+        # En-tête mémorisé avec le préambule dont il est issu
+        self._header_cache = None
     
     def generate_document_header(self) -> str:
-        """Génère l'en-tête du document LaTeX."""
-        lines = [
-            "\\documentclass{article}",
-            *self.config.LATEX_PACKAGES,
-            *self.config.LATEX_SETTINGS,
-            "\\begin{document}\n"
-        ]
-        return "\n".join(lines)
+        """Génère l'en-tête du document LaTeX (recalculé seulement si le préambule a changé)."""
+        preamble = self.config.LATEX_PREAMBLE
+        if self._header_cache is None or self._header_cache[0] is not preamble:
+            header = f"\\documentclass{{article}}\n{preamble}\\begin{{document}}\n"
+            self._header_cache = (preamble, header)
+        return self._header_cache[1]
     
     def generate_document_footer(self) -> str:
         """Génère le pied de page du document LaTeX."""
@@ -66,13 +67,13 @@ class LaTeXGenerator:
             "\\end{center}\n\n"
         )
     
-    def generate_toc(self, sections: List[str], subsections: List[str]) -> str:
+    def generate_toc(self, sections: List[str], subsections: List[Tuple[Optional[str], str]]) -> str:
         """
         Génère la table des matières (ordre du jour).
         
         Args:
             sections: Liste des titres de sections
-
+            subsections: Paires (section parente, titre de la sous-section) ; non modifiée
         
         Returns:
             Code LaTeX pour la table des matières
@@ -86,15 +87,17 @@ class LaTeXGenerator:
             "\\hspace*{-0.5cm}\\begin{varwidth}{\\textwidth}",
         ]
         
+        # Regrouper les sous-sections par section parente en un seul passage
+        by_section: Dict[Optional[str], List[str]] = {}
+        for parent, sub in subsections:
+            by_section.setdefault(parent, []).append(sub)
+        
         for section in sections:
-            escaped_section = self.text_processor.escape_latex(section)
-            escaped_section = self.text_processor.capitalize_first_letter(escaped_section)
+            escaped_section = self.text_processor.prepare(section, capitalize=True)
             lines.append(f"\\textbf{{- {escaped_section}}}\\\\ ")
             # Ajouter les sous-sections associées
-            while subsections and subsections[0].startswith(section):
-                subsections.pop(0)
-                sub = subsections.pop(0)     
-                escaped_sub = self.text_processor.escape_latex(sub)
+            for sub in by_section.pop(section, ()):
+                escaped_sub = self.text_processor.prepare(sub)
                 lines.append(f"\\hspace*{{0.8cm}} - \\textbf{{{escaped_sub}}}\\\\ ")
         
         lines.append("\\end{varwidth}")
@@ -121,10 +124,11 @@ class LaTeXGenerator:
             "",
             "\\begin{multicols}{2}"
         ]
-        for name in names:
-            escaped_name = self.text_processor.escape_latex(name.strip())
+        last = len(names) - 1
+        for i, name in enumerate(names):
+            escaped_name = self.text_processor.prepare(name.strip())
             if escaped_name:
-                if names.index(name) < len(names) - 1:
+                if i < last:
                     lines.append(f" {escaped_name}\\\\ ")
                 else:
                     lines.append(f" {escaped_name} ")
@@ -136,14 +140,12 @@ class LaTeXGenerator:
     
     def generate_section(self, title: str) -> str:
         """Génère une section."""
-        escaped_title = self.text_processor.escape_latex(title)
-        escaped_title = self.text_processor.capitalize_first_letter(escaped_title)
+        escaped_title = self.text_processor.prepare(title, capitalize=True)
         return f"\\section{{{escaped_title}}}\n\n"
     
     def generate_subsection(self, title: str) -> str:
         """Génère une sous-section."""
-        escaped_title = self.text_processor.escape_latex(title)
-        escaped_title = self.text_processor.capitalize_first_letter(escaped_title)
+        escaped_title = self.text_processor.prepare(title, capitalize=True)
         return f"\\subsection*{{{escaped_title}}}\n\n"
     
     def generate_paragraph(self, text: str, runs=None) -> str:
@@ -163,9 +165,8 @@ class LaTeXGenerator:
         # Vérifier si c'est un paragraphe avec définition (contient ":")
         if ":" in text and runs is None:
             parts = text.split(":", 1)
-            bold_part = f"\\textbf{{{self.text_processor.escape_latex(parts[0].strip())}}}"
-            remaining = self.text_processor.escape_latex(parts[1].strip())
-            remaining = self.text_processor.replace_abbreviations(remaining)
+            bold_part = f"\\textbf{{{self.text_processor.prepare(parts[0].strip())}}}"
+            remaining = self.text_processor.prepare(parts[1].strip(), abbrev=True)
             return f"{bold_part} : {remaining}\n\n"
         
         # Paragraphe normal avec formatage des runs si disponible
@@ -178,10 +179,9 @@ class LaTeXGenerator:
     
     def _format_runs(self, runs) -> str:
         """Formate les runs d'un paragraphe en conservant le style."""
-        latex_text = ""
+        parts = []
         for run in runs:
-            run_text = self.text_processor.escape_latex(run.text.strip())
-            run_text = self.text_processor.replace_abbreviations(run_text)
+            run_text = self.text_processor.prepare(run.text.strip(), abbrev=True)
             
             if run.bold:
                 run_text = f"\\textbf{{{run_text}}}"
@@ -189,9 +189,9 @@ class LaTeXGenerator:
                 run_text = f"\\textit{{{run_text}}}"
             
             if run_text:
-                latex_text += run_text + " "
+                parts.append(run_text)
         
-        return latex_text.strip()
+        return " ".join(parts).strip()
     
     def generate_table(self, table_data: List[List[str]]) -> str:
         """
@@ -208,23 +208,17 @@ class LaTeXGenerator:
         
         num_cols = len(table_data[0])
         
-        lines = [
-            "\\begin{table}[h]",
-            "\\centering",
-            "\\begin{tabular}{|" + " | ".join(["c"] * num_cols) + " |}",
-            "\\hline"
-        ]
-        
-        for row in table_data:
-            lines.append(" & ".join(row) + " \\\\")
-            lines.append("\\hline")
-        
-        lines.extend([
-            "\\end{tabular}",
-            "\\end{table}\n"
-        ])
-        
-        return "\n".join(lines)
+        # Les cellules sont déjà échappées par TableProcessor.extract_table_data
+        with io.StringIO() as buf:
+            buf.write("\\begin{table}[h]\n\\centering\n")
+            buf.write("\\begin{tabular}{|" + " | ".join(["c"] * num_cols) + " |}\n\\hline\n")
+            
+            for row in table_data:
+                buf.write(" & ".join(row))
+                buf.write(" \\\\\n\\hline\n")
+            
+            buf.write("\\end{tabular}\n\\end{table}\n")
+            return buf.getvalue()
     
     def generate_logo_section(self) -> str:
         """Génère la section avec le logo en bas de page."""
@@ -2,17 +2,49 @@
 text_corrector.py - Module de correction orthographique et grammaticale
 """
 
-from typing import List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from itertools import accumulate
+from typing import AbstractSet, Dict, List, Optional, Tuple
 import logging
+import random
+import re
+import time
 
 logger = logging.getLogger(__name__)
 
+# Nouvelles tentatives sur erreur temporaire de l'API (429, 5xx)
+_MAX_API_ATTEMPTS = 4
+_BACKOFF_BASE = 1.0  # secondes
+_BACKOFF_MAX = 30.0
+
+# Marqueur numéroté placé avant chaque paragraphe d'un lot : l'index permet de réaligner
+# la réponse même si le modèle perd, ajoute ou réordonne un segment
+_PARA_MARKER = "<<<PARA_{}>>>"
+_PARA_MARKER_RE = re.compile(r"<<<PARA_(\d+)>>>\s*")
+
+# Textes sans rien à corriger : uniquement chiffres/ponctuation (dates, numéros d'article...)
+# ou sigle isolé
+_NO_CORRECT_RE = re.compile(r'^[\W\d\s]+$|^[A-Z]{1,3}\.?$')
+
+# Nombre de textes uniques corrigés gardés en mémoire (cache vidé en entier au-delà)
+_SINGLE_CACHE_SIZE = 2048
+
+
+def _is_transient_error(error: Exception) -> bool:
+    """Indique si une erreur de l'API mérite une nouvelle tentative (limite de débit ou 5xx)."""
+    status = getattr(error, 'status_code', None)
+    return isinstance(status, int) and (status == 429 or status >= 500)
+
+
 class TextCorrector:
     """Classe pour la correction orthographique et grammaticale."""
     
     def __init__(self, config):
         self.config = config
         self.cohere_client = None
+        # Cache de correct_single_text : {texte: (whitelist, texte corrigé)}, la whitelist
+        # étant comparée par identité (rechargée = nouvelle liste)
+        self._single_cache: Dict[str, Tuple[List[str], str]] = {}
         self._init_cohere()
     
     def _init_cohere(self):
@@ -34,7 +66,8 @@ class TextCorrector:
         
         Args:
             paragraphs: Liste des objets paragraphes à corriger
-            batch_size: Taille des lots (utilise la config par défaut si None)
+            batch_size: Nombre maximal de paragraphes par lot (config par défaut si None) ;
+                les lots sont aussi limités par config.MAX_CHARS_PER_BATCH
             whitelist: Liste de mots à ne pas corriger
         
         Returns:
@@ -47,34 +80,90 @@ class TextCorrector:
         batch_size = batch_size or self.config.BATCH_SIZE
         whitelist = whitelist or self.config.CORRECTION_WHITELIST
         
-        # Filtrer les paragraphes non vides
-        valid_paragraphs = [(i, p) for i, p in enumerate(paragraphs) if p.text.strip()]
+        # Ne garder que les paragraphes ayant quelque chose à corriger
+        if whitelist is self.config.CORRECTION_WHITELIST:
+            skip_words = self.config.CORRECTION_WHITELIST_SET
+        else:
+            skip_words = {word.casefold() for word in whitelist}
+        # `paragraph.text` reparcourt le XML des runs à chaque accès : lu une seule fois ici
+        valid_paragraphs = [
+            (i, p, text.strip()) for i, p in enumerate(paragraphs)
+            if self._needs_correction(text := p.text, skip_words)
+        ]
         
         if not valid_paragraphs:
             return paragraphs
         
-        corrected_count = 0
-        total_batches = (len(valid_paragraphs) + batch_size - 1) // batch_size
+        batches = list(self._pack_batches(
+            valid_paragraphs, batch_size, self.config.MAX_CHARS_PER_BATCH
+        ))
+        total_batches = len(batches)
         
-        for batch_idx in range(0, len(valid_paragraphs), batch_size):
-            batch = valid_paragraphs[batch_idx:batch_idx + batch_size]
-            current_batch_num = (batch_idx // batch_size) + 1
-            
-            logger.info(f"Traitement du lot {current_batch_num}/{total_batches}")
+        # Les prompts sont construits ici ; seuls les appels réseau (indépendants) partent
+        # en parallèle, et les paragraphes python-docx ne sont modifiés que depuis ce thread
+        prompts = [self._build_prompt(self._join_batch(batch), whitelist) for batch in batches]
+        
+        corrected_count = 0
+        workers = max(1, min(self.config.MAX_CONCURRENCY, total_batches))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(self._send_prompt, prompt) for prompt in prompts]
             
-            # Corriger le lot
-            corrected_batch = self._correct_batch(batch, whitelist)
-            corrected_count += len(corrected_batch)
+            for batch_num, (batch, future) in enumerate(zip(batches, futures), 1):
+                logger.info(f"Traitement du lot {batch_num}/{total_batches}")
+                
+                # Appliquer les corrections du lot
+                corrected_batch = self._apply_batch_correction(batch, future.result(), whitelist)
+                corrected_count += len(corrected_batch)
         
         logger.info(f"Correction terminée : {corrected_count} paragraphes traités")
         return paragraphs
     
+    @staticmethod
+    def _needs_correction(text: str, skip_words: AbstractSet[str]) -> bool:
+        """
+        Indique si un texte mérite un appel à l'API : faux pour un texte vide ou blanc,
+        purement numérique/ponctuation, un sigle isolé ou un mot unique de la whitelist.
+        """
+        # Texte vide ou blanc écarté sans allouer de copie strippée
+        if not text or text.isspace():
+            return False
+        text = text.strip()
+        return not _NO_CORRECT_RE.match(text) and text.casefold() not in skip_words
+    
+    def _pack_batches(self, items: List[tuple], max_items: int, max_chars: int):
+        """
+        Regroupe les tuples (index, paragraphe, texte) en lots remplis au plus près d'un budget
+        de caractères (marqueurs compris) sans dépasser `max_items` paragraphes.
+        
+        Un paragraphe plus long que le budget forme un lot à lui seul.
+        """
+        batch = []
+        batch_chars = 0
+        
+        for item in items:
+            item_chars = len(item[2]) + 2  # + sauts de ligne autour du marqueur
+            added = item_chars + len(_PARA_MARKER.format(len(batch)))
+            if batch and (len(batch) >= max_items or batch_chars + added > max_chars):
+                yield batch
+                batch = []
+                batch_chars = 0
+                added = item_chars + len(_PARA_MARKER.format(0))
+            batch.append(item)
+            batch_chars += added
+        
+        if batch:
+            yield batch
+    
+    def _join_batch(self, batch: List[tuple]) -> str:
+        """Joint les textes d'un lot de tuples (index, paragraphe, texte), chacun précédé de son marqueur."""
+        return "\n".join(f"{_PARA_MARKER.format(i)}\n{text}" for i, (_, _, text) in enumerate(batch))
+    
     def _correct_batch(self, batch: List[tuple], whitelist: List[str]) -> List:
         """
         Corrige un lot de paragraphes.
         
         Args:
-            batch: Liste de tuples (index, paragraphe)
+            batch: Liste de tuples (index, paragraphe, texte strippé)
             whitelist: Liste de mots à ne pas corriger
         
         Returns:
@@ -83,28 +172,61 @@ class TextCorrector:
         if not batch:
             return []
         
-        # Extraire les textes
-        texts = [para.text.strip() for _, para in batch]
-        
-        # Joindre les textes avec le séparateur
-        joined_text = self.config.BATCH_SEPARATOR.join(texts)
-        
         # Corriger via l'API
-        corrected_text = self._call_correction_api(joined_text, whitelist)
+        corrected_text = self._call_correction_api(self._join_batch(batch), whitelist)
+        return self._apply_batch_correction(batch, corrected_text, whitelist)
+    
+    def _apply_batch_correction(
+        self, batch: List[tuple], corrected_text: Optional[str],
+        whitelist: Optional[List[str]] = None
+    ) -> List:
+        """
+        Applique aux paragraphes d'un lot le texte corrigé renvoyé par l'API.
         
+        Args:
+            batch: Liste de tuples (index, paragraphe, texte strippé)
+            corrected_text: Textes corrigés précédés de leurs marqueurs (None en cas d'échec)
+            whitelist: Whitelist du lot ; si fournie, les paragraphes absents de la réponse
+                sont recorrigés
+        
+        Returns:
+            Liste des paragraphes corrigés
+        """
         if not corrected_text:
             return []
         
-        # Séparer les textes corrigés
-        corrected_texts = corrected_text.split(self.config.BATCH_SEPARATOR)
+        # Séparer les textes corrigés : [préambule, index, texte, index, texte, ...]
+        parts = _PARA_MARKER_RE.split(corrected_text)
+        corrected_texts = {int(index): text for index, text in zip(parts[1::2], parts[2::2])}
+        if not corrected_texts and len(batch) == 1:
+            # Marqueur supprimé par le modèle : la réponse entière est le paragraphe
+            corrected_texts = {0: parts[0]}
         
-        # Appliquer les corrections aux paragraphes originaux
+        # Appliquer les corrections aux paragraphes originaux, alignées par index
         corrected_paragraphs = []
-        for i, corrected in enumerate(corrected_texts):
-            if i < len(batch):
-                _, para = batch[i]
-                self._update_paragraph_text(para, corrected.strip())
-                corrected_paragraphs.append(para)
+        missing = []
+        for i, item in enumerate(batch):
+            corrected = corrected_texts.get(i)
+            if corrected is None:
+                missing.append(item)
+                continue
+            para = item[1]
+            self._update_paragraph_text(para, corrected.strip())
+            corrected_paragraphs.append(para)
+        
+        # Paragraphes absents de la réponse : recorrigés à part (par moitiés si rien n'a été
+        # reconnu) plutôt que laissés silencieusement non corrigés
+        if missing and whitelist is not None and len(batch) > 1:
+            logger.warning(
+                f"Réponse incomplète ({len(missing)}/{len(batch)} paragraphes manquants), "
+                "nouvelle correction"
+            )
+            if len(missing) == len(batch):
+                half = len(batch) // 2
+                corrected_paragraphs += self._correct_batch(batch[:half], whitelist)
+                corrected_paragraphs += self._correct_batch(batch[half:], whitelist)
+            else:
+                corrected_paragraphs += self._correct_batch(missing, whitelist)
         
         return corrected_paragraphs
     
@@ -122,28 +244,46 @@ class TextCorrector:
         if not self.cohere_client:
             return None
         
-        # Mettre à jour la whitelist dans la config temporairement
-        original_whitelist = self.config.CORRECTION_WHITELIST
-        self.config.CORRECTION_WHITELIST = whitelist
+        return self._send_prompt(self._build_prompt(text, whitelist))
+    
+    def _build_prompt(self, text: str, whitelist: List[str]) -> str:
+        """Construit le prompt de correction de `text` avec la whitelist donnée."""
+        return self.config.get_correction_prompt(text, whitelist)
+    
+    def _send_prompt(self, prompt: str) -> Optional[str]:
+        """
+        Envoie un prompt à l'API (appelable depuis plusieurs threads).
         
-        try:
-            prompt = self.config.get_correction_prompt(text)
-            
-            response = self.cohere_client.chat(
-                model=self.config.COHERE_MODEL,
-                message=prompt,
-                temperature=0.0
-            )
-            
-            return response.text.strip()
-            
-        except Exception as e:
-            logger.error(f"Erreur lors de la correction: {e}")
-            logger.debug(f"Texte non corrigé: {text[:200]}...")
-            return text
-        finally:
-            # Restaurer la whitelist originale
-            self.config.CORRECTION_WHITELIST = original_whitelist
+        Returns:
+            Texte corrigé, ou None en cas d'erreur (les paragraphes restent alors intacts
+            au lieu d'être réécrits avec leur propre texte)
+        """
+        for attempt in range(1, _MAX_API_ATTEMPTS + 1):
+            try:
+                # Place tenue pendant la requête seulement, pas pendant l'attente avant nouvel essai
+                with self.config.api_slot():
+                    response = self.cohere_client.chat(
+                        model=self.config.COHERE_MODEL,
+                        message=prompt,
+                        temperature=0.0
+                    )
+                
+                return response.text.strip()
+                
+            except Exception as e:
+                if attempt < _MAX_API_ATTEMPTS and _is_transient_error(e):
+                    # Attente exponentielle avec gigue ("full jitter")
+                    delay = random.uniform(0, min(_BACKOFF_MAX, _BACKOFF_BASE * 2 ** attempt))
+                    logger.warning(
+                        f"Erreur temporaire de l'API ({e}), nouvelle tentative "
+                        f"{attempt + 1}/{_MAX_API_ATTEMPTS} dans {delay:.1f}s"
+                    )
+                    time.sleep(delay)
+                    continue
+                
+                logger.error(f"Erreur lors de la correction: {e}")
+                logger.debug(f"Prompt non traité: {prompt[-200:]}...")
+                return None
     
     def _update_paragraph_text(self, paragraph, new_text: str):
         """
@@ -173,30 +313,22 @@ class TextCorrector:
             runs: Liste des runs du paragraphe
             new_text: Texte à distribuer
         """
-        # Calculer la longueur proportionnelle pour chaque run
-        total_length = sum(len(run.text) for run in runs)
+        # Bornes de chaque run proportionnelles aux longueurs cumulées (arithmétique entière :
+        # pas de dérive d'arrondi, et la dernière borne vaut exactement len(new_text))
+        cumulative = list(accumulate(len(run.text) for run in runs))
+        total_length = cumulative[-1]
         if total_length == 0:
             runs[0].text = new_text
             for run in runs[1:]:
                 run.text = ""
             return
         
-        remaining_text = new_text
-        for i, run in enumerate(runs):
-            if not remaining_text:
-                run.text = ""
-                continue
-            
-            # Calculer la proportion de texte pour ce run
-            if i == len(runs) - 1:
-                # Dernier run : prendre tout le reste
-                run.text = remaining_text
-                remaining_text = ""
-            else:
-                proportion = len(run.text) / total_length
-                chars_to_take = int(len(new_text) * proportion)
-                run.text = remaining_text[:chars_to_take]
-                remaining_text = remaining_text[chars_to_take:]
+        new_length = len(new_text)
+        start = 0
+        for run, cum in zip(runs, cumulative):
+            end = cum * new_length // total_length
+            run.text = new_text[start:end]
+            start = end
     
     def correct_single_text(self, text: str, whitelist: Optional[List[str]] = None) -> str:
         """
@@ -213,6 +345,17 @@ class TextCorrector:
             return text
         
         whitelist = whitelist or self.config.CORRECTION_WHITELIST
+        
+        # Titres, en-têtes et noms reviennent souvent à l'identique : un seul appel API par texte
+        cached = self._single_cache.get(text)
+        if cached is not None and cached[0] is whitelist:
+            return cached[1]
+        
         corrected = self._call_correction_api(text, whitelist)
+        if not corrected:
+            return text
         
-        return corrected if corrected else text
\ No newline at end of file
+        if len(self._single_cache) >= _SINGLE_CACHE_SIZE:
+            self._single_cache.clear()
+        self._single_cache[text] = (whitelist, corrected)
+        return corrected
\ No newline at end of file
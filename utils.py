@@ -3,47 +3,109 @@ utils.py - Fonctions utilitaires pour le traitement du texte et LaTeX
 """
 
 import re
-from typing import Dict, List, Optional
+from functools import partial
+from typing import Dict, List, Optional, Tuple
+
+
+def _match_case(replacement: str, match) -> str:
+    """Remplacement d'une abréviation, capitalisé si le mot trouvé commence par une majuscule."""
+    return replacement.capitalize() if match.group(0)[0].isupper() else replacement
+
+
+# En-têtes de section ("1) ...") et de sous-section ("a) ..."), et titre du document
+_SECTION_RE = re.compile(r"^\d+\)")
+_SUBSECTION_RE = re.compile(r"^[a-zA-Z]\)")
+_HEADER_RE = re.compile(r"^(?:(\d+)|[a-zA-Z])\)")
+_TITLE_RE = re.compile(r"PV RC (\d+) - Anno (LIX|[IVXLCDM]+) - (\d{4})-(\d{2})-(\d{2})")
+
 
 class TextProcessor:
     """Classe pour le traitement et la transformation du texte."""
     
+    # Taille maximale du cache des textes déjà transformés par prepare()
+    PREPARED_CACHE_SIZE = 4096
+    
     def __init__(self, config):
         self.config = config
+        self._prepared: Dict[tuple, str] = {}
+        self._prepared_tables = None
     
     def escape_latex(self, text: str) -> str:
         """Échappe les caractères spéciaux LaTeX pour éviter les erreurs."""
         if not text:
             return text
             
-        for char, replacement in self.config.LATEX_SPECIAL_CHARS.items():
-            text = text.replace(char, replacement)
-        return text
+        # Cas courant (aucune séquence de plusieurs caractères) : une seule traduction
+        table = self.config.LATEX_TRANSLATE_TABLE
+        pattern = self.config.LATEX_SEQUENCES_PATTERN
+        if pattern is None:
+            return text.translate(table)
+        
+        # Sinon : découpage autour des séquences ; les morceaux de texte (indices pairs)
+        # restent traduits par str.translate, sans rappel Python par caractère
+        sequences = self.config.LATEX_SPECIAL_SEQUENCES
+        parts = pattern.split(text)
+        parts[::2] = [part.translate(table) for part in parts[::2]]
+        parts[1::2] = [sequences[seq] for seq in parts[1::2]]
+        return ''.join(parts)
     
     def replace_abbreviations(self, text: str, type=["begin", "end"]) -> str:
         """Remplace les abréviations par leur forme complète."""
         if not text:
             return text
         
-        # Ajoute une ponctuation finale si nécessaire
-        if "end" in type and not text.rstrip().endswith((".", "?", "!")):
-            text = text.rstrip() + "."
+        # Ajoute une ponctuation finale si nécessaire (un seul rstrip)
+        if "end" in type:
+            stripped = text.rstrip()
+            if not stripped.endswith((".", "?", "!")):
+                text = stripped + "."
         
-        # Met en majuscule la première lettre
-        if text and "begin" in type:
-            text.strip()
+        # Met en majuscule la première lettre (text n'est jamais vide ici)
+        if "begin" in type:
             text = text[0].upper() + text[1:]
         
-        # Remplace les abréviations
-        for pattern, replacement in self.config.ABBREVIATIONS.items():
-            def replace_match(match):
-                word = match.group(0)
-                return replacement.capitalize() if word[0].isupper() else replacement
-            
-            text = re.sub(pattern, replace_match, text, flags=re.IGNORECASE)
+        # Remplace les abréviations (motif fusionné précompilé, une seule passe)
+        pattern = self.config.ABBREVIATIONS_PATTERN
+        if pattern is not None:
+            return pattern.sub(self._replace_abbreviation, text)
+        
+        # Repli (motif fusionné invalide) : un motif précompilé à la fois
+        for compiled, replacement in self.config.ABBREVIATIONS_COMPILED:
+            text = compiled.sub(partial(_match_case, replacement), text)
         
         return text
     
+    def _replace_abbreviation(self, match) -> str:
+        """Retourne le remplacement de l'abréviation trouvée en conservant la casse initiale."""
+        return _match_case(self.config.ABBREVIATIONS_GROUPS[match.lastindex], match)
+    
+    def prepare(self, text: str, capitalize: bool = False, abbrev: bool = False,
+                type=("begin", "end")) -> str:
+        """
+        Échappe le texte, puis met éventuellement en majuscule la première lettre et
+        remplace les abréviations (escape_latex + capitalize_first_letter + replace_abbreviations).
+
+        Les mêmes textes (titres, mots, ponctuation, dates) reviennent souvent : le résultat
+        est mis en cache tant que les tables de la config ne changent pas.
+        """
+        tables = (self.config.LATEX_SPECIAL_SEQUENCES, self.config.ABBREVIATIONS_COMPILED)
+        if self._prepared_tables is None or any(
+            a is not b for a, b in zip(tables, self._prepared_tables)
+        ) or len(self._prepared) >= self.PREPARED_CACHE_SIZE:
+            self._prepared.clear()
+            self._prepared_tables = tables
+        
+        key = (text, capitalize, abbrev, tuple(type) if abbrev else None)
+        result = self._prepared.get(key)
+        if result is None:
+            result = self.escape_latex(text)
+            if capitalize:
+                result = self.capitalize_first_letter(result)
+            if abbrev:
+                result = self.replace_abbreviations(result, type=type)
+            self._prepared[key] = result
+        return result
+    
     def capitalize_first_letter(self, text: str) -> str:
         """Met en majuscule la première lettre d'un texte."""
         if text:
@@ -52,8 +114,10 @@ class TextProcessor:
     
     def ensure_punctuation(self, text: str) -> str:
         """S'assure que le texte se termine par une ponctuation."""
-        if text and not text.rstrip().endswith((".", "?", "!")):
-            return text.rstrip() + "."
+        if text:
+            stripped = text.rstrip()
+            if not stripped.endswith((".", "?", "!")):
+                return stripped + "."
         return text
 
 
@@ -74,8 +138,7 @@ class DocumentParser:
         Raises:
             ValueError: Si le format du titre n'est pas reconnu
         """
-        pattern = r"PV RC (\d+) - Anno (LIX|[IVXLCDM]+) - (\d{4})-(\d{2})-(\d{2})"
-        match = re.match(pattern, title)
+        match = _TITLE_RE.match(title)
         
         if not match:
             raise ValueError(f"Le format du titre '{title}' n'est pas reconnu")
@@ -105,12 +168,12 @@ class DocumentParser:
     @staticmethod
     def is_section_header(text: str) -> bool:
         """Détermine si un texte est un en-tête de section."""
-        return bool(re.match(r"^\d+\)", text))
+        return _SECTION_RE.match(text) is not None
     
     @staticmethod
     def is_subsection_header(text: str) -> bool:
         """Détermine si un texte est un en-tête de sous-section."""
-        return bool(re.match(r"^[a-zA-Z]\)", text))
+        return _SUBSECTION_RE.match(text) is not None
     
     @staticmethod
     def extract_section_title(text: str) -> str:
@@ -120,22 +183,40 @@ class DocumentParser:
         return text
     
     @staticmethod
-    def extract_sections_list(paragraphs) -> List[str]:
-        """Extrait la liste de toutes les sections du document."""
+    def extract_sections_list(paragraphs) -> Tuple[List[str], List[Tuple[Optional[str], str]]]:
+        """
+        Extrait la liste de toutes les sections du document.
+        
+        Returns:
+            Tuple (titres des sections, paires (section parente, titre de la sous-section))
+        """
         sections = []
         subsections = []
         for para in paragraphs:
-            text = para.text.strip()
-            if DocumentParser.is_section_header(text):
-                section_title = DocumentParser.extract_section_title(text)
-                sections.append(section_title)
-            elif DocumentParser.is_subsection_header(text):
-                subsection_title = DocumentParser.extract_section_title(text)
-                subsections.append(section_title)
-                subsections.append(subsection_title)
+            DocumentParser.collect_section_header(para.text, sections, subsections)
         return sections, subsections
     
-
+    @staticmethod
+    def collect_section_header(
+        text: str, sections: List[str], subsections: List[Tuple[Optional[str], str]]
+    ) -> None:
+        """
+        Ajoute le texte aux listes de sections / sous-sections s'il s'agit d'un en-tête.
+        
+        Une sous-section est ajoutée sous forme de paire (section parente, titre) ; la
+        section parente vaut None si aucune section ne la précède. Le texte n'est
+        nettoyé que s'il s'agit bien d'un en-tête.
+        """
+        # Un seul motif pour les deux types d'en-tête : le groupe 1 (numéro) désigne une section
+        text = text.lstrip()
+        match = _HEADER_RE.match(text)
+        if match is None:
+            return
+        title = text[match.end():].strip()
+        if match.group(1) is not None:
+            sections.append(title)
+        else:
+            subsections.append((sections[-1] if sections else None, title))
 
 
 class TableProcessor:
@@ -153,38 +234,34 @@ class TableProcessor:
         Returns:
             Liste de listes représentant les données du tableau
         """
-        table_data = []
-        
-        for row in table.rows:
-            row_data = []
-            for cell in row.cells:
-                if cell.paragraphs:
-                    formatted_texts = []
-                    for para in cell.paragraphs:
-                        formatted_text = TableProcessor._format_paragraph(para, text_processor)
-                        if formatted_text:
-                            formatted_texts.append(formatted_text)
-                    cell_text = " ".join(formatted_texts)
-                else:
-                    cell_text = ""
-                row_data.append(cell_text)
-            table_data.append(row_data)
-        
-        return table_data
+        format_paragraph = TableProcessor._format_paragraph
+        
+        # Une cellule vide (sans paragraphe) donne naturellement ""
+        return [
+            [
+                " ".join(
+                    text for para in cell.paragraphs
+                    if (text := format_paragraph(para, text_processor))
+                )
+                for cell in row.cells
+            ]
+            for row in table.rows
+        ]
     
     @staticmethod
     def _format_paragraph(para, text_processor: TextProcessor) -> str:
         """Formate un paragraphe en conservant le style (gras, italique)."""
-        latex_text = ""
+        prepare = text_processor.prepare
+        parts = []
         for run in para.runs:
-            run_text = text_processor.escape_latex(run.text.strip())
+            run_text = prepare(run.text.strip())
             if run.bold:
                 run_text = f"\\textbf{{{run_text}}}"
             if run.italic:
                 run_text = f"\\textit{{{run_text}}}"
             if run_text:
-                latex_text += run_text + " "
-        return latex_text.strip()
+                parts.append(run_text)
+        return " ".join(parts).strip()
     
     @staticmethod
     def remove_duplicate_columns(table_data: List[List[str]]) -> List[List[str]]:
@@ -203,11 +280,13 @@ class TableProcessor:
         num_cols = len(table_data[0])
         columns_to_remove = set()
         
-        # Identifier les colonnes dupliquées
-        for col1 in range(num_cols - 1):
-            for col2 in range(col1 + 1, num_cols):
-                if all(row[col1] == row[col2] for row in table_data):
-                    columns_to_remove.add(col2)
+        # Identifier les colonnes dupliquées : chaque colonne (tuple hachable) n'est
+        # comparée qu'à la première colonne identique rencontrée, en un seul passage
+        first_seen = {}
+        for col in range(num_cols):
+            column = tuple(row[col] for row in table_data)
+            if first_seen.setdefault(column, col) != col:
+                columns_to_remove.add(col)
         
         # Filtrer les colonnes
         return [